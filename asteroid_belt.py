@@ -8,12 +8,28 @@ KIRKWOOD_GAPS = [
     (3.27, 0.04),
 ]
 
+# 轨道根数记录（角度单位为弧度，与 sim.add 一致）
+ORBIT_DTYPE = np.dtype([
+    ('a', '<f8'),
+    ('e', '<f8'),
+    ('inc', '<f8'),
+    ('Omega', '<f8'),
+    ('omega', '<f8'),
+    ('f', '<f8'),
+])
+
 def in_kirkwood_gaps(a):
     for center, width in KIRKWOOD_GAPS:
         if np.abs(a - center) < 0.1:
             return True
     return False
 
+def kirkwood_gap_mask(a):
+    """in_kirkwood_gaps 的向量化版本，返回布尔数组"""
+    a = np.asarray(a)
+    centers = np.array([center for center, width in KIRKWOOD_GAPS])
+    return np.any(np.abs(a[..., None] - centers) < 0.1, axis=-1)
+
 def add_main_belt(sim, N=20000, primary=None, rng=None):
     if rng is None:
         rng = np.random.default_rng()
@@ -121,4 +137,33 @@ def add_trojans(sim, N=5000, jupiter=None, jupiter_a=5.2, rng=None):
             omega=rng.uniform(0, 2*np.pi),
             f=f,
             primary=jupiter
-        )
\ No newline at end of file
+        )
+
+
+# ==================== 批量加入 ====================
+# 轨道根数由 distributions.py 中的群体模型批量生成
+
+def add_orbits(sim, orbits, primary=None):
+    """
+    将 ORBIT_DTYPE 数组中的无质量粒子加入模拟
+
+    Parameters:
+    -----------
+    sim : rebound.Simulation
+        REBOUND 模拟对象
+    orbits : numpy.ndarray
+        ORBIT_DTYPE 结构化数组
+    primary : rebound.Particle
+        主天体粒子对象
+    """
+    for row in orbits:
+        sim.add(
+            m=0,
+            a=float(row['a']),
+            e=float(row['e']),
+            inc=float(row['inc']),
+            Omega=float(row['Omega']),
+            omega=float(row['omega']),
+            f=float(row['f']),
+            primary=primary
+        )
@@ -1,7 +1,8 @@
 #模型和注册表
 
 from dataclasses import dataclass
-from typing import Optional, List
+from collections import defaultdict
+from typing import Optional, List, Dict, Iterable
 import rebound
 import numpy as np
 
@@ -457,6 +458,116 @@ class SolarSystemBodies:
         return None
 
 
+class SystemBuilder:
+    """
+    层级天体系统构建器
+
+    按 primary 字段对天体做拓扑排序后插入模拟，支持任意深度的层级
+    （行星 → 卫星 → 子卫星）。每个插入的粒子以天体名称作为 REBOUND 的
+    粒子名（REBOUND 5 中取代 hash 的永久标识），之后通过名称找回主天体，
+    不依赖固定的粒子序号，也不持有可能因粒子数组扩容而失效的 Particle 引用。
+    """
+
+    def __init__(self, sim: rebound.Simulation):
+        self.sim = sim
+        # 名称 -> 插入时的粒子序号；序号用于 O(1) 查找，粒子名用于校验
+        self._inserted: Dict[str, int] = {}
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._inserted
+
+    def particle(self, name: str):
+        """根据名称取得已插入的粒子（每次调用都返回新的引用）"""
+        if name not in self._inserted:
+            raise KeyError(f"天体 '{name}' 尚未插入")
+        index = self._inserted[name]
+        if index < self.sim.N:
+            p = self.sim.particles[index]
+            if p.name == name:
+                return p
+        # 粒子被移除或重排后退回 REBOUND 的按名称查找
+        return self.sim.particles[name]
+
+    def _insert(self, body: CelestialBodyConfig, primary_particle=None):
+        if primary_particle is None and body.primary is not None and body.primary in self._inserted:
+            primary_particle = self.particle(body.primary)
+        body.add_to_simulation(self.sim, primary_particle=primary_particle, name=body.name)
+        self._inserted[body.name] = self.sim.N - 1
+
+    def add_bodies(
+        self,
+        bodies: Iterable[CelestialBodyConfig],
+        missing_primary: str = "error",
+        primary_overrides: Optional[dict] = None
+    ) -> List[str]:
+        """
+        一次性插入一批天体，O(N)
+
+        主天体已就绪（已插入或无主天体）的天体按输入顺序立即插入，
+        其余天体等待主天体插入后再插入。输入本身已按层级排序时，插入顺序与输入相同。
+
+        Parameters:
+        -----------
+        bodies : iterable of CelestialBodyConfig
+            要插入的天体
+        missing_primary : str
+            主天体既不在本批次中、也未插入时的处理方式：
+            "error" 抛出 ValueError，"skip" 跳过该天体及其下属天体，
+            "detach" 不指定主天体直接插入
+        primary_overrides : dict
+            天体名称 -> 主天体粒子，直接指定主天体（兼容旧的 primary_map）
+
+        Returns:
+        --------
+        list of str
+            实际插入的天体名称（按插入顺序）
+        """
+        if missing_primary not in ("error", "skip", "detach"):
+            raise ValueError(f"未知的 missing_primary: '{missing_primary}'")
+        if primary_overrides is None:
+            primary_overrides = {}
+
+        bodies = list(bodies)
+        names = set()
+        for body in bodies:
+            if body.name in names or body.name in self._inserted:
+                raise ValueError(f"天体 '{body.name}' 重复")
+            names.add(body.name)
+
+        waiting = defaultdict(list)  # 主天体名称 -> 等待插入的天体
+        inserted = []
+
+        def insert_with_descendants(body):
+            stack = [body]
+            while stack:
+                current = stack.pop()
+                self._insert(current, primary_overrides.get(current.name))
+                inserted.append(current.name)
+                # 逆序压栈，保持同级天体的输入顺序
+                stack.extend(reversed(waiting.pop(current.name, [])))
+
+        for body in bodies:
+            primary = body.primary
+            if (primary is None or body.name in primary_overrides
+                    or primary in self._inserted):
+                insert_with_descendants(body)
+            elif primary in names:
+                waiting[primary].append(body)
+            elif missing_primary == "detach":
+                insert_with_descendants(body)
+            elif missing_primary == "skip":
+                continue
+            else:
+                raise ValueError(f"天体 '{body.name}' 的主天体 '{primary}' 不存在")
+
+        # "skip" 模式下被跳过天体的下属天体留在 waiting 中；其他模式下剩余的只能是环
+        if waiting and missing_primary != "skip":
+            pending = sorted(b.name for group in waiting.values() for b in group)
+            raise ValueError(f"主天体关系存在环: {pending}")
+
+        return inserted
+
+
 def add_solar_system(
     sim: rebound.Simulation,
     include_sun: bool = True,
@@ -479,46 +590,31 @@ def add_solar_system(
         是否包含主要卫星
     include_dwarfs : bool
         是否包含矮行星
+
+    Returns:
+    --------
+    SystemBuilder
+        构建器，可按名称取得已插入的粒子
     """
     db = SolarSystemBodies()
 
-    # 添加太阳
+    bodies = []
     if include_sun:
-        db.SUN.add_to_simulation(sim)
-
-    # 添加行星
+        bodies.append(db.SUN)
     if include_planets:
-        for planet in db.get_all_planets():
-            planet.add_to_simulation(sim)
-
-    # 添加卫星（需要找到对应的主天体）
+        bodies += db.get_all_planets()
+    # 卫星按 primary 字段挂到对应行星上；主天体未加入时跳过该卫星
     if include_moons:
-        # 按顺序添加卫星，映射主天体
-        name_to_index = {
-            "Earth": 3,  # 水星、金星、地球
-            "Mars": 4,
-            "Jupiter": 5,
-            "Saturn": 6,
-            "Uranus": 7,
-            "Neptune": 8
-        }
-
-        moon_configs = db.get_all_moons()
-        for moon in moon_configs:
-            primary_name = moon.primary
-            if primary_name in name_to_index:
-                idx = name_to_index[primary_name]
-                if idx < len(sim.particles):
-                    primary_particle = sim.particles[idx]
-                    moon.add_to_simulation(sim, primary_particle=primary_particle)
-
-    # 添加矮行星
+        bodies += db.get_all_moons()
     if include_dwarfs:
-        for dwarf in db.get_dwarf_planets():
-            dwarf.add_to_simulation(sim)
+        bodies += db.get_dwarf_planets()
+
+    builder = SystemBuilder(sim)
+    builder.add_bodies(bodies, missing_primary="skip")
 
     # 移动到质心系
     sim.move_to_com()
+    return builder
 
 
 def add_planets_by_name(sim: rebound.Simulation, names: list, primary_map: dict = None):
@@ -532,22 +628,27 @@ def add_planets_by_name(sim: rebound.Simulation, names: list, primary_map: dict
     names : list
         天体名称列表
     primary_map : dict
-        主天体映射字典，用于卫星（格式：{'Moon': sim.particles[3]}）
+        主天体映射字典，用于卫星（格式：{'Moon': sim.particles[3]}）；
+        通常不再需要，主天体在 names 中时会按名称自动解析
+
+    Returns:
+    --------
+    SystemBuilder
+        构建器，可按名称取得已插入的粒子
     """
     db = SolarSystemBodies()
 
-    if primary_map is None:
-        primary_map = {}
-
+    bodies = []
     for name in names:
         body = db.get_by_name(name)
         if body is not None:
-            # 如果是卫星且提供了主天体映射
-            if body.primary and body.name in primary_map:
-                body.add_to_simulation(sim, primary_particle=primary_map[body.name])
-            else:
-                body.add_to_simulation(sim)
+            bodies.append(body)
         else:
             print(f"警告：未找到天体 '{name}'")
 
+    # 卫星的主天体在同一批次中时自动解析，否则不指定主天体
+    builder = SystemBuilder(sim)
+    builder.add_bodies(bodies, missing_primary="detach", primary_overrides=primary_map)
+
     sim.move_to_com()
+    return builder
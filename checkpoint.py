@@ -0,0 +1,241 @@
+"""
+检查点与断点续算
+快照追加到 REBOUND Simulationarchive，另用定长时间索引文件快速定位
+"""
+import os
+import time
+import numpy as np
+import rebound
+
+
+# 索引文件的定长记录：模拟时间、积分耗时、快照在存档中的序号
+INDEX_DTYPE = np.dtype([
+    ('t', '<f8'),
+    ('walltime', '<f8'),
+    ('blob', '<i8'),
+])
+
+
+class CheckpointManager:
+    """
+    检查点管理器
+
+    快照写入 REBOUND 的 Simulationarchive 二进制文件：首个快照保存完整状态，
+    之后的快照由 REBOUND 以二进制差分追加，只记录发生变化的字段。
+    存档保存了积分器的全部内部状态，因此从快照重启与不中断的积分逐位一致。
+
+    每写一个快照，同时向 ``<path>.idx`` 追加一条 INDEX_DTYPE 记录。
+    索引不依赖 REBOUND 即可读出全部快照时间，按模拟时间定位快照只需二分查找，
+    不必解码任何快照；进程中断后以存档为准修复索引。
+    加载快照时 REBOUND 打开存档仍会读取一遍各快照的头部，
+    同一管理器只打开一次并缓存。
+    只用于读取（seek/restore）时可以不指定 interval 和 walltime。
+
+    Parameters:
+    -----------
+    path : str
+        存档文件路径
+    interval : float
+        按模拟时间写快照的间隔（与 sim.t 同单位）
+    walltime : float
+        按墙钟时间写快照的间隔（秒）
+    slice_dt : float
+        仅按墙钟时间写快照时，每次检查墙钟前推进的模拟时间；
+        默认取 interval，若未指定则取 100 个步长
+    """
+
+    def __init__(self, path, interval=None, walltime=None, slice_dt=None):
+        if interval is not None and interval <= 0:
+            raise ValueError("interval 必须为正数")
+        if walltime is not None and walltime <= 0:
+            raise ValueError("walltime 必须为正数")
+
+        self.path = path
+        self.index_path = path + ".idx"
+        self.interval = interval
+        self.walltime = walltime
+        self.slice_dt = slice_dt
+
+        self._archive = None
+        self._reconciled = False
+
+    # ==================== 索引 ====================
+
+    def read_index(self):
+        """以内存映射方式读取时间索引（忽略末尾不完整的记录）"""
+        if not os.path.exists(self.index_path):
+            return np.zeros(0, dtype=INDEX_DTYPE)
+        n = os.path.getsize(self.index_path) // INDEX_DTYPE.itemsize
+        if n == 0:
+            return np.zeros(0, dtype=INDEX_DTYPE)
+        return np.memmap(self.index_path, dtype=INDEX_DTYPE, mode='r', shape=(n,))
+
+    @property
+    def times(self):
+        """所有快照的模拟时间"""
+        self._reconcile()
+        return np.array(self.read_index()['t'])
+
+    def __len__(self):
+        self._reconcile()
+        return len(self.read_index())
+
+    def _append_index(self, t, walltime, blob):
+        record = np.array([(t, walltime, blob)], dtype=INDEX_DTYPE)
+        with open(self.index_path, 'ab') as f:
+            record.tofile(f)
+
+    def _reconcile(self):
+        """
+        使索引与存档一致
+
+        进程可能在写完存档、尚未写索引时被中断，也可能在写索引时留下半条记录，
+        这里以存档中的快照数为准截断或补齐索引。
+        """
+        if self._reconciled:
+            return
+        self._reconciled = True
+
+        if not os.path.exists(self.path):
+            if os.path.exists(self.index_path):
+                os.remove(self.index_path)
+            return
+
+        archive = self._open_archive()
+        n_blobs = len(archive)
+        index = np.array(self.read_index())
+
+        if len(index) > n_blobs or (
+                os.path.exists(self.index_path) and
+                os.path.getsize(self.index_path) != len(index) * INDEX_DTYPE.itemsize):
+            # 写入临时文件后替换，已有的内存映射仍指向旧文件，不会因截断而失效
+            index = index[:n_blobs]
+            tmp_path = self.index_path + ".tmp"
+            with open(tmp_path, 'wb') as f:
+                index.tofile(f)
+            os.replace(tmp_path, self.index_path)
+
+        for blob in range(len(index), n_blobs):
+            sim = archive[blob]
+            self._append_index(sim.t, sim.walltime, blob)
+
+    def _open_archive(self):
+        if self._archive is None:
+            self._archive = rebound.Simulationarchive(self.path)
+        return self._archive
+
+    # ==================== 写入 ====================
+
+    def snapshot(self, sim):
+        """立即追加一个快照"""
+        self._reconcile()
+        blob = len(self.read_index())
+        sim.save_to_file(self.path)
+        self._append_index(sim.t, sim.walltime, blob)
+        # 存档已变化，下次读取时重新打开
+        self._archive = None
+
+    def integrate(self, sim, tmax):
+        """
+        积分到 tmax，期间按设定的节奏写快照，结束时再写一个
+
+        为保证与不中断积分的步序列相同，使用 exact_finish_time=0，
+        因此快照时间对齐到步长，可能略晚于名义的检查点时间。
+
+        Parameters:
+        -----------
+        sim : rebound.Simulation
+            REBOUND 模拟对象
+        tmax : float
+            积分终止时间
+        """
+        if self.interval is None and self.walltime is None:
+            raise ValueError("interval 和 walltime 至少需要指定一个")
+
+        self._reconcile()
+        self._snapshot_if_new(sim)
+
+        slice_dt = self.slice_dt
+        if slice_dt is None:
+            slice_dt = self.interval if self.interval is not None else 100 * abs(sim.dt)
+
+        next_t = sim.t + self.interval if self.interval is not None else None
+        last_wall = time.monotonic()
+
+        while sim.t < tmax:
+            target = tmax
+            if next_t is not None:
+                target = min(target, next_t)
+            if self.walltime is not None:
+                target = min(target, sim.t + slice_dt)
+
+            sim.integrate(target, exact_finish_time=0)
+
+            due = False
+            if next_t is not None and sim.t >= next_t:
+                due = True
+                while next_t <= sim.t:
+                    next_t += self.interval
+            if self.walltime is not None and time.monotonic() - last_wall >= self.walltime:
+                due = True
+
+            if due and sim.t < tmax:
+                self.snapshot(sim)
+                last_wall = time.monotonic()
+
+        # 已到达 tmax 的任务被重新调度时不重复写入相同时间的快照
+        self._snapshot_if_new(sim)
+        return sim
+
+    def _snapshot_if_new(self, sim):
+        index = self.read_index()
+        if len(index) == 0 or index['t'][-1] != sim.t:
+            self.snapshot(sim)
+
+    # ==================== 读取与重启 ====================
+
+    def restore(self):
+        """
+        从最后一个快照恢复模拟
+
+        注意：附加力等 Python 回调不会保存在存档中，需要调用者重新设置。
+        """
+        self._reconcile()
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(f"检查点文件不存在: {self.path}")
+        return self._open_archive()[-1]
+
+    def resume_or_create(self, factory):
+        """
+        存在检查点时从最后一个快照恢复，否则调用 factory() 创建新模拟
+
+        Parameters:
+        -----------
+        factory : callable
+            无参数函数，返回新的 rebound.Simulation，
+            例如 main.create_realistic_asteroid_system
+        """
+        self._reconcile()
+        if os.path.exists(self.path):
+            return self.restore()
+        return factory()
+
+    def nearest(self, t):
+        """返回模拟时间最接近 t 的快照在索引中的位置"""
+        self._reconcile()
+        times = self.read_index()['t']
+        if len(times) == 0:
+            raise ValueError("检查点中没有快照")
+
+        i = int(np.searchsorted(times, t))
+        if i >= len(times):
+            return len(times) - 1
+        if i > 0 and abs(times[i - 1] - t) <= abs(times[i] - t):
+            return i - 1
+        return i
+
+    def seek(self, t):
+        """加载模拟时间最接近 t 的快照"""
+        i = self.nearest(t)
+        record = self.read_index()[i]
+        return self._open_archive()[int(record['blob'])]
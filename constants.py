@@ -0,0 +1,8 @@
+"""
+物理常数
+单位为 AU、yr（儒略年）、Msun，与 REBOUND 中 sim.units = ('yr', 'AU', 'Msun') 一致
+"""
+
+GAUSSIAN_K = 0.01720209895  # 高斯引力常数（AU^1.5 Msun^-0.5 day^-1）
+G = (GAUSSIAN_K * 365.25) ** 2  # 引力常数（AU^3 Msun^-1 yr^-2），与 REBOUND 的 sim.G 相同
+C_LIGHT = 63241.077084266  # 光速（AU/yr）
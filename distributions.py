@@ -0,0 +1,481 @@
+"""
+基于分布的小行星群体合成器
+经验直方图与 (a, e, inc) 联合表通过别名表（Vose）采样，每个样本 O(1)、无需拒绝
+"""
+import os
+from dataclasses import dataclass, field
+from functools import cached_property, lru_cache
+from typing import Optional, Tuple
+import numpy as np
+from asteroid_belt import ORBIT_DTYPE, KIRKWOOD_GAPS, kirkwood_gap_mask
+
+
+# ==================== 别名表 ====================
+
+class AliasTable:
+    """
+    离散分布的别名表
+
+    构建 O(K)，每次抽样只需一个均匀整数和一个均匀浮点数。
+    权重为 0 的项永远不会被抽到，可用于表示空隙。
+    """
+
+    def __init__(self, weights):
+        w = np.asarray(weights, dtype=float)
+        if w.ndim != 1 or len(w) == 0:
+            raise ValueError("权重必须是非空一维数组")
+        if not np.all(np.isfinite(w)) or np.any(w < 0):
+            raise ValueError("权重必须是有限的非负数")
+        total = w.sum()
+        if total <= 0:
+            raise ValueError("权重之和必须为正数")
+
+        K = len(w)
+        scaled = (w * K / total).tolist()
+        prob = np.zeros(K)
+        alias = np.arange(K)
+
+        small = [i for i in range(K) if scaled[i] < 1.0]
+        large = [i for i in range(K) if scaled[i] >= 1.0]
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            prob[s] = scaled[s]
+            alias[s] = l
+            scaled[l] = scaled[l] + scaled[s] - 1.0
+            if scaled[l] < 1.0:
+                small.append(l)
+            else:
+                large.append(l)
+
+        # 剩余项只由舍入误差产生；零权重项仍指向有效项
+        fallback = int(np.argmax(w))
+        for i in small + large:
+            if w[i] > 0:
+                prob[i] = 1.0
+            else:
+                prob[i] = 0.0
+                alias[i] = fallback
+
+        self.prob = prob
+        self.alias = alias
+
+    def __len__(self):
+        return len(self.prob)
+
+    def sample(self, n, rng):
+        """抽取 n 个项的序号"""
+        i = rng.integers(0, len(self.prob), size=n)
+        u = rng.random(n)
+        return np.where(u < self.prob[i], i, self.alias[i])
+
+
+# ==================== 一维分布 ====================
+
+@dataclass
+class Uniform:
+    """均匀分布 U(low, high)"""
+    low: float
+    high: float
+
+    def prepare(self):
+        pass
+
+    def sample(self, n, rng):
+        return rng.uniform(self.low, self.high, size=n)
+
+
+@dataclass
+class Normal:
+    """正态分布 N(mean, std)"""
+    mean: float
+    std: float
+
+    def prepare(self):
+        pass
+
+    def sample(self, n, rng):
+        return rng.normal(self.mean, self.std, size=n)
+
+
+@dataclass
+class Discrete:
+    """在给定取值上的离散分布（weights 为 None 时等概率）"""
+    values: np.ndarray
+    weights: Optional[np.ndarray] = None
+
+    def __post_init__(self):
+        self.values = np.asarray(self.values, dtype=float)
+        if self.weights is None:
+            self.weights = np.ones(len(self.values))
+        self.weights = np.asarray(self.weights, dtype=float)
+        if self.values.shape != self.weights.shape:
+            raise ValueError("values 与 weights 长度不一致")
+
+    @cached_property
+    def table(self):
+        return AliasTable(self.weights)
+
+    def prepare(self):
+        self.table
+
+    def sample(self, n, rng):
+        return self.values[self.table.sample(n, rng)]
+
+
+@dataclass
+class Histogram:
+    """
+    分段常数分布：按权重选择区间（别名表），再在区间内均匀抽样
+
+    Parameters:
+    -----------
+    edges : array_like
+        K+1 个单调递增的区间边界
+    weights : array_like
+        K 个区间的权重（不必归一化）
+    """
+    edges: np.ndarray
+    weights: np.ndarray
+
+    def __post_init__(self):
+        self.edges = np.asarray(self.edges, dtype=float)
+        self.weights = np.asarray(self.weights, dtype=float)
+        if self.edges.ndim != 1 or len(self.edges) != len(self.weights) + 1:
+            raise ValueError("edges 的长度必须比 weights 多 1")
+        if np.any(np.diff(self.edges) <= 0):
+            raise ValueError("edges 必须严格递增")
+
+    @cached_property
+    def table(self):
+        return AliasTable(self.weights)
+
+    def prepare(self):
+        self.table
+
+    def sample(self, n, rng):
+        i = self.table.sample(n, rng)
+        low = self.edges[i]
+        return low + (self.edges[i + 1] - low) * rng.random(n)
+
+
+@dataclass
+class Jittered:
+    """base + jitter，例如离散的聚集中心叠加正态扰动"""
+    base: object
+    jitter: object
+
+    def prepare(self):
+        self.base.prepare()
+        self.jitter.prepare()
+
+    def sample(self, n, rng):
+        return self.base.sample(n, rng) + self.jitter.sample(n, rng)
+
+
+# ==================== 联合分布 ====================
+
+@dataclass
+class JointHistogram:
+    """
+    多维分段常数分布：按权重选择一个盒子（别名表），再在盒子内均匀抽样
+
+    Parameters:
+    -----------
+    lows : array_like
+        形状 (K, d) 的盒子下界
+    highs : array_like
+        形状 (K, d) 的盒子上界
+    weights : array_like
+        K 个盒子的权重
+    names : tuple
+        各维对应的轨道根数名称
+    """
+    lows: np.ndarray
+    highs: np.ndarray
+    weights: np.ndarray
+    names: Tuple[str, ...] = ('a', 'e', 'inc')
+
+    def __post_init__(self):
+        self.lows = np.asarray(self.lows, dtype=float)
+        self.highs = np.asarray(self.highs, dtype=float)
+        self.weights = np.asarray(self.weights, dtype=float)
+        self.names = tuple(self.names)
+        if self.lows.shape != self.highs.shape or self.lows.ndim != 2:
+            raise ValueError("lows 与 highs 必须是形状相同的 (K, d) 数组")
+        if self.lows.shape != (len(self.weights), len(self.names)):
+            raise ValueError("盒子数量或维数与 weights/names 不一致")
+        if np.any(self.highs < self.lows):
+            raise ValueError("盒子上界不能小于下界")
+
+    @classmethod
+    def from_grid(cls, edges, counts, names=('a', 'e', 'inc')):
+        """由规则网格（每维一组边界）和计数数组构建"""
+        counts = np.asarray(counts, dtype=float)
+        edges = [np.asarray(e, dtype=float) for e in edges]
+        if counts.shape != tuple(len(e) - 1 for e in edges):
+            raise ValueError("counts 的形状必须与各维边界数减 1 一致")
+
+        # 只保留非零格子，避免大而稀疏的表占用内存
+        cells = np.nonzero(counts)
+        lows = np.stack([e[c] for e, c in zip(edges, cells)], axis=1)
+        highs = np.stack([e[c + 1] for e, c in zip(edges, cells)], axis=1)
+        return cls(lows, highs, counts[cells], names)
+
+    @cached_property
+    def table(self):
+        return AliasTable(self.weights)
+
+    def prepare(self):
+        self.table
+
+    def sample(self, n, rng):
+        """返回形状 (n, d) 的样本"""
+        i = self.table.sample(n, rng)
+        low = self.lows[i]
+        return low + (self.highs[i] - low) * rng.random((n, len(self.names)))
+
+
+# ==================== 群体模型 ====================
+
+def _uniform_angle():
+    return Uniform(0, 2 * np.pi)
+
+
+@dataclass
+class PopulationModel:
+    """
+    小行星群体模型：每个轨道根数一个分布，角度单位为弧度
+
+    joint 不为空时，其覆盖的根数（通常为 a, e, inc）由联合分布抽取，
+    对应的独立分布被忽略。
+    """
+    name: str
+    a: object = None
+    e: object = None
+    inc: object = None
+    Omega: object = field(default_factory=_uniform_angle)
+    omega: object = field(default_factory=_uniform_angle)
+    f: object = field(default_factory=_uniform_angle)
+    joint: Optional[JointHistogram] = None
+
+    def _marginals(self):
+        covered = set(self.joint.names) if self.joint is not None else set()
+        for key in ORBIT_DTYPE.names:
+            if key in covered:
+                continue
+            dist = getattr(self, key)
+            if dist is None:
+                raise ValueError(f"群体模型 '{self.name}' 缺少 {key} 的分布")
+            yield key, dist
+
+    def prepare(self):
+        """预先构建所有别名表（在分发给工作进程之前调用）"""
+        if self.joint is not None:
+            self.joint.prepare()
+        for key, dist in self._marginals():
+            dist.prepare()
+
+    def sample(self, n, rng):
+        """
+        生成 n 个小行星的轨道根数
+
+        Parameters:
+        -----------
+        n : int
+            小行星数量
+        rng : numpy.random.Generator
+            随机数生成器
+
+        Returns:
+        --------
+        numpy.ndarray
+            ORBIT_DTYPE 结构化数组
+        """
+        orbits = np.empty(n, dtype=ORBIT_DTYPE)
+        if self.joint is not None:
+            values = self.joint.sample(n, rng)
+            for k, key in enumerate(self.joint.names):
+                orbits[key] = values[:, k]
+        for key, dist in self._marginals():
+            orbits[key] = dist.sample(n, rng)
+        return orbits
+
+
+# ==================== 从本地文件加载 ====================
+
+def _histogram_from_rows(rows):
+    """由 (low, high, weight) 行构建直方图，行间空隙以零权重区间填补"""
+    rows = rows[np.argsort(rows[:, 0])]
+    edges = [rows[0, 0]]
+    weights = []
+    for low, high, weight in rows:
+        if low < edges[-1]:
+            raise ValueError("直方图区间不能重叠")
+        if low > edges[-1]:
+            edges.append(low)
+            weights.append(0.0)
+        edges.append(high)
+        weights.append(weight)
+    return np.array(edges), np.array(weights)
+
+
+def _npz_arrays(path, data, *keys):
+    """读取 .npz 中的数组，缺少键时与文本格式一样报 ValueError"""
+    missing = [key for key in keys if key not in data]
+    if missing:
+        raise ValueError(f"{path}: 缺少键 {missing}")
+    return [data[key] for key in keys]
+
+
+@lru_cache(maxsize=None)
+def _load_histogram(path, mtime_ns, degrees):
+    if path.endswith('.npz'):
+        with np.load(path) as data:
+            weights_key = 'weights' if 'weights' in data else 'counts'
+            edges, weights = _npz_arrays(path, data, 'edges', weights_key)
+    else:
+        rows = np.loadtxt(path, delimiter=',', comments='#', ndmin=2)
+        if rows.shape[1] != 3:
+            raise ValueError(f"{path}: 每行应为 low, high, weight")
+        edges, weights = _histogram_from_rows(rows)
+
+    if degrees:
+        edges = np.radians(edges)
+    hist = Histogram(edges, weights)
+    hist.prepare()
+    return hist
+
+
+@lru_cache(maxsize=None)
+def _load_joint_table(path, mtime_ns, inc_degrees):
+    if path.endswith('.npz'):
+        with np.load(path) as data:
+            *edges, counts = _npz_arrays(path, data, 'a_edges', 'e_edges', 'inc_edges', 'counts')
+        if inc_degrees:
+            edges[2] = np.radians(edges[2])
+        table = JointHistogram.from_grid(edges, counts)
+    else:
+        rows = np.loadtxt(path, delimiter=',', comments='#', ndmin=2)
+        if rows.shape[1] != 7:
+            raise ValueError(f"{path}: 每行应为 a_lo, a_hi, e_lo, e_hi, inc_lo, inc_hi, weight")
+        lows = rows[:, [0, 2, 4]].copy()
+        highs = rows[:, [1, 3, 5]].copy()
+        if inc_degrees:
+            lows[:, 2] = np.radians(lows[:, 2])
+            highs[:, 2] = np.radians(highs[:, 2])
+        table = JointHistogram(lows, highs, rows[:, 6])
+
+    table.prepare()
+    return table
+
+
+def load_histogram(path, degrees=False):
+    """
+    从本地文件加载一维经验直方图
+
+    支持 .npz（键 edges 与 weights/counts）和逗号分隔文本（每行 low, high, weight，
+    以 # 开头的行为注释）。结果按 (路径, 修改时间) 缓存，别名表只构建一次。
+
+    Parameters:
+    -----------
+    path : str
+        文件路径
+    degrees : bool
+        区间边界是否以度为单位（转换为弧度）
+    """
+    path = os.path.abspath(path)
+    return _load_histogram(path, os.stat(path).st_mtime_ns, degrees)
+
+
+def load_joint_table(path, inc_degrees=True):
+    """
+    从本地文件加载 (a, e, inc) 联合分布表
+
+    支持 .npz（键 a_edges、e_edges、inc_edges 与三维 counts）和逗号分隔文本
+    （每行 a_lo, a_hi, e_lo, e_hi, inc_lo, inc_hi, weight）。
+    结果按 (路径, 修改时间) 缓存。
+
+    Parameters:
+    -----------
+    path : str
+        文件路径
+    inc_degrees : bool
+        倾角是否以度为单位（星表通常如此，转换为弧度）
+    """
+    path = os.path.abspath(path)
+    return _load_joint_table(path, os.stat(path).st_mtime_ns, inc_degrees)
+
+
+# ==================== 预设群体 ====================
+
+def main_belt_model(a_min=2.0, a_max=3.4):
+    """
+    主带：a 在 [a_min, a_max] 内均匀分布并挖去柯克伍德空隙
+
+    空隙直接编码为零权重区间，与 add_main_belt 的拒绝采样分布相同，但无需重抽。
+    """
+    bounds = [a_min, a_max]
+    for center, width in KIRKWOOD_GAPS:
+        # 与 in_kirkwood_gaps 一致，空隙半宽取 0.1 AU
+        bounds += [center - 0.1, center + 0.1]
+    edges = np.unique(np.clip(bounds, a_min, a_max))
+    mid = 0.5 * (edges[:-1] + edges[1:])
+    weights = np.diff(edges) * ~kirkwood_gap_mask(mid)
+
+    return PopulationModel(
+        name="main_belt",
+        a=Histogram(edges, weights),
+        e=Uniform(0.0, 0.2),
+        inc=Uniform(0.0, 0.25),
+    )
+
+
+def hilda_model():
+    """希尔达群：3:2 共振，三个聚集中心（对应 add_hilda_group）"""
+    return PopulationModel(
+        name="hilda",
+        a=Normal(3.97, 0.05),
+        e=Uniform(0.1, 0.3),
+        inc=Uniform(0.0, 0.3),
+        f=Jittered(Discrete([0, 2 * np.pi / 3, 4 * np.pi / 3]), Normal(0, 0.2)),
+    )
+
+
+def trojan_model(jupiter_a=5.2):
+    """木星特洛伊群：L4/L5 附近（对应 add_trojans）"""
+    return PopulationModel(
+        name="trojans",
+        a=Normal(jupiter_a, 0.02),
+        e=Uniform(0.0, 0.15),
+        inc=Uniform(0.0, 0.35),
+        f=Jittered(Discrete([np.pi / 3, -np.pi / 3]), Normal(0, 0.2)),
+    )
+
+
+# 预设名称 -> 模型工厂函数
+PRESETS = {
+    "main_belt": main_belt_model,
+    "hilda": hilda_model,
+    "trojans": trojan_model,
+}
+
+
+def get_population_model(population, **kwargs):
+    """
+    获取群体模型
+
+    Parameters:
+    -----------
+    population : str or PopulationModel
+        预设名称（见 PRESETS）或已构建的模型
+    **kwargs
+        传给预设工厂函数的参数（如 trojan_model 的 jupiter_a）
+    """
+    if isinstance(population, PopulationModel):
+        if kwargs:
+            raise ValueError("直接传入 PopulationModel 时不接受额外参数")
+        return population
+    if population not in PRESETS:
+        raise ValueError(f"未知的群体 '{population}'，可选: {sorted(PRESETS)}")
+    return PRESETS[population](**kwargs)
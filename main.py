@@ -7,7 +7,8 @@ import numpy as np
 from celestial_bodies import (
     add_solar_system,
     add_planets_by_name,
-    SolarSystemBodies
+    SolarSystemBodies,
+    SystemBuilder
 )
 from asteroid_belt import add_main_belt, add_hilda_group, add_trojans
 
@@ -64,21 +65,13 @@ def create_custom_system():
     sim.units = ('yr', 'AU', 'Msun')
     sim.integrator = "ias15"
 
-    # 添加太阳
-    sun = SolarSystemBodies.SUN.add_to_simulation(sim)
+    # 太阳、内行星、木星及伽利略卫星；卫星按 primary 字段自动挂到木星上
+    bodies = [SolarSystemBodies.SUN]
+    for body_name in ['Mercury', 'Venus', 'Earth', 'Mars', 'Jupiter']:
+        bodies.append(SolarSystemBodies.get_by_name(body_name))
+    bodies += SolarSystemBodies.get_galilean_moons()
 
-    # 添加内行星和木星
-    bodies = ['Mercury', 'Venus', 'Earth', 'Mars', 'Jupiter']
-    for body_name in bodies:
-        body = SolarSystemBodies.get_by_name(body_name)
-        body.add_to_simulation(sim)
-
-    # 添加木星的伽利略卫星
-    jupiter = sim.particles[5]  # 太阳+4个内行星后木星是第6个
-    galilean_moons = SolarSystemBodies.get_galilean_moons()
-
-    for moon in galilean_moons:
-        moon.add_to_simulation(sim, primary_particle=jupiter)
+    SystemBuilder(sim).add_bodies(bodies)
 
     sim.move_to_com()
     return sim
@@ -93,8 +86,8 @@ def create_realistic_asteroid_system(seed=42):
     sim.integrator = "whfast"
     sim.dt = 0.02
 
-    sun = sim.add(m=1.0)
-    jupiter = sim.add(m=9.5e-4, a=5.2, e=0.048)
+    sun = sim.add(m=1.0, name="Sun")
+    jupiter = sim.add(m=9.5e-4, a=5.2, e=0.048, name="Jupiter")
 
     add_main_belt(sim, N=20000, primary=sun, rng=rng)
     add_hilda_group(sim, N=3000, jupiter=jupiter, rng=rng)
@@ -0,0 +1,238 @@
+"""
+观测者视角的视位置
+批量计算天体测量赤经赤纬、距离与相位角，光行时改正以数组运算迭代
+"""
+import numpy as np
+from asteroid_belt import ORBIT_DTYPE
+from constants import C_LIGHT, G
+
+
+# 单位：AU、yr、Msun（与模拟一致）；取 REBOUND 的 G，使 elements_to_state 与 sim.add 一致
+GM_SUN = G
+
+_ARCSEC = np.pi / 180.0 / 3600.0
+
+
+def _rot1(angle):
+    c, s = np.cos(angle), np.sin(angle)
+    return np.array([[1, 0, 0], [0, c, s], [0, -s, c]])
+
+
+def _rot2(angle):
+    c, s = np.cos(angle), np.sin(angle)
+    return np.array([[c, 0, -s], [0, 1, 0], [s, 0, c]])
+
+
+def _rot3(angle):
+    c, s = np.cos(angle), np.sin(angle)
+    return np.array([[c, s, 0], [-s, c, 0], [0, 0, 1]])
+
+
+# J2000 平黄道 -> ICRS：IAU 2006 黄赤交角与参考架偏差（IERS Conventions 2010, 式 5.21、5.33）
+OBLIQUITY_J2000 = 84381.406 * _ARCSEC
+_FRAME_BIAS = _rot1(0.0068192 * _ARCSEC) @ _rot2(-0.016617 * _ARCSEC) @ _rot3(-0.0146 * _ARCSEC)
+ECLIPTIC_TO_ICRS = (_rot1(OBLIQUITY_J2000) @ _FRAME_BIAS).T
+
+
+def elements_to_state(orbits, mu=GM_SUN):
+    """
+    由 ORBIT_DTYPE 轨道根数（以真近点角 f 给出）批量计算相对主天体的位置与速度
+
+    Returns:
+    --------
+    (xyz, vxvyvz) : 形状均为 (N, 3)
+    """
+    a, e, inc = orbits['a'], orbits['e'], orbits['inc']
+    Omega, omega, f = orbits['Omega'], orbits['omega'], orbits['f']
+
+    p = a * (1 - e ** 2)
+    r = p / (1 + e * np.cos(f))
+    vfac = np.sqrt(mu / p)
+
+    # 近焦点坐标系
+    x_pf = r * np.cos(f)
+    y_pf = r * np.sin(f)
+    vx_pf = -vfac * np.sin(f)
+    vy_pf = vfac * (e + np.cos(f))
+
+    cO, sO = np.cos(Omega), np.sin(Omega)
+    co, so = np.cos(omega), np.sin(omega)
+    ci, si = np.cos(inc), np.sin(inc)
+    P = np.stack([cO * co - sO * so * ci, sO * co + cO * so * ci, so * si], axis=-1)
+    Q = np.stack([-cO * so - sO * co * ci, -sO * so + cO * co * ci, co * si], axis=-1)
+
+    xyz = x_pf[:, None] * P + y_pf[:, None] * Q
+    vxvyvz = vx_pf[:, None] * P + vy_pf[:, None] * Q
+    return xyz, vxvyvz
+
+
+def retarded_positions(observer_xyz, target_xyz, target_vxvyvz, sun_xyz=None,
+                       gm=GM_SUN, c=C_LIGHT, iterations=3):
+    """
+    光行时改正：求目标在 t - tau 时刻的位置，使 |r(t - tau) - r_obs(t)| = c tau
+
+    r(t - tau) 以二阶泰勒展开 r - v tau + a tau^2 / 2 近似，a 为太阳引力加速度；
+    tau 以不动点迭代求解，每次迭代都是整批数组运算。
+
+    Returns:
+    --------
+    (retarded, tau) : 形状 (..., N, 3) 与 (..., N)
+    """
+    observer = np.asarray(observer_xyz, dtype=float)[..., None, :]
+    r = np.asarray(target_xyz, dtype=float)
+    v = np.asarray(target_vxvyvz, dtype=float)
+    sun = np.zeros(3) if sun_xyz is None else np.asarray(sun_xyz, dtype=float)[..., None, :]
+
+    helio = r - sun
+    acc = -gm * helio / np.linalg.norm(helio, axis=-1, keepdims=True) ** 3
+
+    tau = np.linalg.norm(r - observer, axis=-1, keepdims=True) / c
+    for _ in range(iterations):
+        retarded = r - v * tau + 0.5 * acc * tau ** 2
+        tau = np.linalg.norm(retarded - observer, axis=-1, keepdims=True) / c
+    retarded = r - v * tau + 0.5 * acc * tau ** 2
+    return retarded, tau[..., 0]
+
+
+def apparent_positions(observer_xyz, target_xyz, target_vxvyvz, sun_xyz=None,
+                       gm=GM_SUN, c=C_LIGHT, iterations=3):
+    """
+    批量计算天体测量位置（ICRS 赤经赤纬，不含光行差与引力偏折）
+
+    坐标为模拟的黄道坐标系（J2000 平黄道），支持广播：
+    observer_xyz 形状 (..., 3)，目标 (..., N, 3)，例如 E 个历元、N 个目标时
+    分别为 (E, 3) 与 (E, N, 3)。光行时改正见 retarded_positions，
+    对主带小行星，二阶截断带来的方向误差小于 1e-3 角秒。
+
+    Parameters:
+    -----------
+    observer_xyz : array_like
+        观测者位置（AU）
+    target_xyz, target_vxvyvz : array_like
+        目标位置（AU）与速度（AU/yr）
+    sun_xyz : array_like
+        太阳位置，默认为原点（日心坐标）
+    gm : float
+        太阳引力常数（AU^3/yr^2）
+    c : float
+        光速（AU/yr）
+    iterations : int
+        光行时迭代次数
+
+    Returns:
+    --------
+    dict
+        ra、dec（度）、distance（AU）、light_time（yr）、phase（相位角，度），
+        形状 (..., N)
+    """
+    observer = np.asarray(observer_xyz, dtype=float)[..., None, :]
+    sun = np.zeros(3) if sun_xyz is None else np.asarray(sun_xyz, dtype=float)[..., None, :]
+    retarded, tau = retarded_positions(observer_xyz, target_xyz, target_vxvyvz,
+                                       sun_xyz, gm, c, iterations)
+
+    los = (retarded - observer) @ ECLIPTIC_TO_ICRS.T
+    distance = np.linalg.norm(los, axis=-1)
+    ra = np.degrees(np.arctan2(los[..., 1], los[..., 0])) % 360.0
+    dec = np.degrees(np.arcsin(los[..., 2] / distance))
+
+    to_sun = sun - retarded
+    to_observer = observer - retarded
+    cos_phase = np.sum(to_sun * to_observer, axis=-1) / (
+        np.linalg.norm(to_sun, axis=-1) * np.linalg.norm(to_observer, axis=-1))
+    phase = np.degrees(np.arccos(np.clip(cos_phase, -1.0, 1.0)))
+
+    return {
+        "ra": ra,
+        "dec": dec,
+        "distance": distance,
+        "light_time": tau,
+        "phase": phase,
+    }
+
+
+def observe_simulation(sim, observer="Earth", targets=None, sun="Sun", c=C_LIGHT):
+    """
+    从模拟的当前状态计算目标的视位置
+
+    Parameters:
+    -----------
+    sim : rebound.Simulation
+        REBOUND 模拟对象（单位 AU、yr、Msun）
+    observer : str or int
+        观测者的粒子名（见 SystemBuilder）或序号
+    targets : array_like
+        目标粒子序号，默认为全部无质量粒子
+    sun : str or int
+        太阳的粒子名或序号
+    """
+    xyz = np.empty((sim.N, 3))
+    vxvyvz = np.empty((sim.N, 3))
+    m = np.empty(sim.N)
+    sim.serialize_particle_data(xyz=xyz, vxvyvz=vxvyvz, m=m)
+
+    if targets is None:
+        targets = np.flatnonzero(m == 0)
+    sun_particle = sim.particles[sun]
+    observer_index = sim.particles[observer].index
+
+    return apparent_positions(
+        xyz[observer_index], xyz[targets], vxvyvz[targets],
+        sun_xyz=xyz[sun_particle.index],
+        gm=sim.G * sun_particle.m, c=c,
+    )
+
+
+def observe_catalog(orbits, observer_xyz, mu=GM_SUN, c=C_LIGHT):
+    """
+    由日心轨道根数星表（ORBIT_DTYPE，与观测者同一历元）计算视位置
+
+    Parameters:
+    -----------
+    orbits : numpy.ndarray
+        ORBIT_DTYPE 结构化数组
+    observer_xyz : array_like
+        观测者日心位置（AU），形状 (3,)
+    """
+    if orbits.dtype != ORBIT_DTYPE:
+        raise ValueError("orbits 必须是 ORBIT_DTYPE 数组")
+    xyz, vxvyvz = elements_to_state(orbits, mu)
+    return apparent_positions(observer_xyz, xyz, vxvyvz, gm=mu, c=c)
+
+
+def compare_with_astropy(observer_xyz, target_xyz, target_vxvyvz, sun_xyz=None,
+                         gm=GM_SUN, c=C_LIGHT):
+    """
+    用 astropy 的坐标变换检验赤经赤纬
+
+    把光行时改正后的视线方向作为 BarycentricMeanEcliptic（J2000）中的向量，
+    由 astropy 变换到 ICRS，并与 apparent_positions 的结果比较。
+    本模块的旋转矩阵取自 IAU 2006 常数，偏差应小于 1e-6 角秒。
+
+    Parameters:
+    -----------
+    observer_xyz : array_like
+        观测者位置，形状 (3,)
+    target_xyz, target_vxvyvz : array_like
+        目标位置与速度，形状 (N, 3)
+
+    Returns:
+    --------
+    numpy.ndarray
+        每个目标的角距（角秒）
+    """
+    import astropy.units as u
+    from astropy.coordinates import (
+        BarycentricMeanEcliptic, CartesianRepresentation, ICRS, SkyCoord
+    )
+
+    result = apparent_positions(observer_xyz, target_xyz, target_vxvyvz, sun_xyz, gm, c)
+    retarded, _ = retarded_positions(observer_xyz, target_xyz, target_vxvyvz, sun_xyz, gm, c)
+
+    los = retarded - np.asarray(observer_xyz, dtype=float)
+    ecliptic = SkyCoord(
+        CartesianRepresentation(los.T * u.AU),
+        frame=BarycentricMeanEcliptic(equinox="J2000"),
+    )
+    reference = ecliptic.transform_to(ICRS())
+    ours = SkyCoord(ra=result["ra"] * u.deg, dec=result["dec"] * u.deg, frame=ICRS())
+    return reference.separation(ours).to_value(u.arcsec)
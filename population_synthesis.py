@@ -0,0 +1,145 @@
+"""
+分块并行的小行星群体合成
+每个数据块使用由种子派生的独立随机数流，结果与工作进程数无关
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from asteroid_belt import ORBIT_DTYPE
+from distributions import get_population_model
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+
+def chunk_bounds(N, chunk_size=DEFAULT_CHUNK_SIZE):
+    """将 [0, N) 划分为长度为 chunk_size 的数据块（最后一块可能更短）"""
+    if chunk_size <= 0:
+        raise ValueError("chunk_size 必须为正数")
+    return [(start, min(start + chunk_size, N)) for start in range(0, N, chunk_size)]
+
+
+def spawn_chunk_seeds(seed, n_chunks):
+    """
+    由种子为每个数据块派生独立的 SeedSequence
+
+    派生只依赖种子和数据块序号，因此同一数据块在任何进程中都得到相同的随机数流。
+    """
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    return seed.spawn(n_chunks)
+
+
+def generate_chunk(model, n, seed_seq):
+    """
+    生成单个数据块的轨道根数
+
+    Parameters:
+    -----------
+    model : distributions.PopulationModel
+        群体模型
+    n : int
+        数据块内的小行星数量
+    seed_seq : numpy.random.SeedSequence
+        该数据块的随机数种子
+    """
+    rng = np.random.default_rng(seed_seq)
+    return model.sample(n, rng)
+
+
+# 工作进程中的群体模型，由 _init_worker 设置一次，避免每个任务重复序列化别名表
+_worker_model = None
+
+
+def _init_worker(model):
+    global _worker_model
+    _worker_model = model
+
+
+def _write_chunk(task):
+    """工作进程：生成一个数据块并直接写入输出文件的对应切片"""
+    path, start, stop, seed_seq = task
+    out = np.load(path, mmap_mode='r+')
+    out[start:stop] = generate_chunk(_worker_model, stop - start, seed_seq)
+    out.flush()
+    del out
+    return stop - start
+
+
+def synthesize_population(path, N, population="main_belt", seed=42,
+                          chunk_size=DEFAULT_CHUNK_SIZE, workers=None, **kwargs):
+    """
+    并行合成 N 个小行星的轨道根数并写入 .npy 文件
+
+    输出只由 (群体模型, N, seed, chunk_size) 决定，与 workers 无关。
+    每个工作进程同时只持有一个数据块，内存占用约为 workers * chunk_size * 48 字节。
+
+    Parameters:
+    -----------
+    path : str
+        输出 .npy 文件路径（ORBIT_DTYPE 结构化数组）
+    N : int
+        小行星总数
+    population : str or distributions.PopulationModel
+        预设名称（见 distributions.PRESETS）或群体模型
+    seed : int or numpy.random.SeedSequence
+        随机数种子
+    chunk_size : int
+        每个数据块的小行星数量
+    workers : int
+        工作进程数，默认为 CPU 核数；为 1 时在当前进程中顺序生成
+    **kwargs
+        传给预设工厂函数的参数（如 trojan_model 的 jupiter_a）
+
+    Returns:
+    --------
+    numpy.memmap
+        只读映射的输出数组
+    """
+    model = get_population_model(population, **kwargs)
+    model.prepare()
+
+    bounds = chunk_bounds(N, chunk_size)
+    seeds = spawn_chunk_seeds(seed, len(bounds))
+
+    # 预先分配输出文件，各数据块写入互不重叠的切片
+    out = np.lib.format.open_memmap(path, mode='w+', dtype=ORBIT_DTYPE, shape=(N,))
+    del out
+
+    tasks = [
+        (path, start, stop, seed_seq)
+        for (start, stop), seed_seq in zip(bounds, seeds)
+    ]
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers == 1:
+        _init_worker(model)
+        for task in tasks:
+            _write_chunk(task)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(model,)) as executor:
+            for _ in executor.map(_write_chunk, tasks):
+                pass
+
+    return np.load(path, mmap_mode='r')
+
+
+def generate_population(N, population="main_belt", seed=42,
+                        chunk_size=DEFAULT_CHUNK_SIZE, **kwargs):
+    """
+    在内存中按相同的分块方式生成群体，结果与 synthesize_population 写出的文件一致
+
+    适用于规模较小、可以直接加入模拟的群体（配合 asteroid_belt.add_orbits）。
+    """
+    model = get_population_model(population, **kwargs)
+    model.prepare()
+
+    bounds = chunk_bounds(N, chunk_size)
+    seeds = spawn_chunk_seeds(seed, len(bounds))
+
+    orbits = np.empty(N, dtype=ORBIT_DTYPE)
+    for (start, stop), seed_seq in zip(bounds, seeds):
+        orbits[start:stop] = generate_chunk(model, stop - start, seed_seq)
+    return orbits
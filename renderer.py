@@ -0,0 +1,272 @@
+"""
+离屏帧渲染
+将粒子位置直接光栅化到 NumPy 图像缓冲区，支持密度累积与细节层次抽稀，
+可在无显示的 Linux 主机上并行输出 PNG 序列或原始视频流
+"""
+import os
+import struct
+import subprocess
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Tuple
+import numpy as np
+import rebound
+from celestial_bodies import SolarSystemBodies
+from checkpoint import CheckpointManager
+
+
+def hex_to_rgb(color):
+    """'#RRGGBB' -> (R, G, B)"""
+    color = color.lstrip("#")
+    return tuple(int(color[i:i + 2], 16) for i in (0, 2, 4))
+
+
+# ==================== 输出 ====================
+
+def write_png(path, image):
+    """
+    将 (H, W, 3) uint8 图像写为 PNG（仅依赖标准库 zlib）
+    """
+    height, width, _ = image.shape
+    # 每行前加一个字节的滤波类型 0
+    raw = np.empty((height, width * 3 + 1), dtype=np.uint8)
+    raw[:, 0] = 0
+    raw[:, 1:] = image.reshape(height, width * 3)
+
+    def chunk(tag, data):
+        body = tag + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body) & 0xFFFFFFFF)
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(chunk(b"IHDR", header))
+        f.write(chunk(b"IDAT", zlib.compress(raw.tobytes(), 6)))
+        f.write(chunk(b"IEND", b""))
+
+
+def ffmpeg_command(output, width, height, fps=30):
+    """从标准输入读取 rgb24 原始帧并编码为视频的 ffmpeg 命令"""
+    return [
+        "ffmpeg", "-y", "-loglevel", "error",
+        "-f", "rawvideo", "-pix_fmt", "rgb24",
+        "-s", f"{width}x{height}", "-r", str(fps), "-i", "-",
+        "-pix_fmt", "yuv420p", output,
+    ]
+
+
+# ==================== 渲染器 ====================
+
+@dataclass
+class FrameRenderer:
+    """
+    帧渲染器配置
+
+    粒子数不超过 point_threshold 时逐点绘制；更多时把粒子累积为每像素计数，
+    再做对数色调映射（密度绘制）。粒子数超过 max_points 时先按固定步长抽稀，
+    并按抽稀比例放大计数，使亮度与完整群体一致。
+    """
+    width: int = 1024
+    height: int = 1024
+    extent: float = 6.0  # 视野半宽（AU）
+    center: Tuple[float, float] = (0.0, 0.0)
+    plane: str = "xy"  # 投影平面：'xy'、'xz' 或 'yz'
+    background: str = "#000000"
+    population_color: str = "#A0A0A0"
+    point_threshold: int = 5000
+    max_points: int = 2_000_000
+    body_radius: int = 4  # 具名天体的圆盘半径（像素）
+
+    def _axes(self):
+        return {"xy": (0, 1), "xz": (0, 2), "yz": (1, 2)}[self.plane]
+
+    def project(self, xyz):
+        """将 (N, 3) 位置投影为像素坐标 (ix, iy) 与是否在画面内的掩码"""
+        i, j = self._axes()
+        scale = 0.5 * min(self.width, self.height) / self.extent
+        px = (xyz[:, i] - self.center[0]) * scale + 0.5 * self.width
+        py = 0.5 * self.height - (xyz[:, j] - self.center[1]) * scale
+        ix = np.floor(px).astype(np.int64)
+        iy = np.floor(py).astype(np.int64)
+        inside = (ix >= 0) & (ix < self.width) & (iy >= 0) & (iy < self.height)
+        return ix, iy, inside
+
+    def density(self, xyz):
+        """每像素的粒子计数（已按抽稀比例放大），形状 (H, W)"""
+        weight = 1.0
+        if len(xyz) > self.max_points:
+            stride = -(-len(xyz) // self.max_points)
+            weight = len(xyz) / len(xyz[::stride])
+            xyz = xyz[::stride]
+
+        ix, iy, inside = self.project(xyz)
+        flat = iy[inside] * self.width + ix[inside]
+        counts = np.bincount(flat, minlength=self.width * self.height)
+        return counts.reshape(self.height, self.width) * weight
+
+    def render(self, xyz, bodies=()):
+        """
+        渲染一帧
+
+        Parameters:
+        -----------
+        xyz : numpy.ndarray
+            群体粒子位置，形状 (N, 3)
+        bodies : iterable of (position, color)
+            需要单独绘制的具名天体，color 为 '#RRGGBB'
+
+        Returns:
+        --------
+        numpy.ndarray
+            (H, W, 3) uint8 图像
+        """
+        background = np.array(hex_to_rgb(self.background), dtype=np.float32)
+        color = np.array(hex_to_rgb(self.population_color), dtype=np.float32)
+        image = np.empty((self.height, self.width, 3), dtype=np.float32)
+        image[:] = background
+
+        xyz = np.asarray(xyz, dtype=float).reshape(-1, 3)
+        if len(xyz) <= self.point_threshold:
+            ix, iy, inside = self.project(xyz)
+            image[iy[inside], ix[inside]] = color
+        else:
+            counts = self.density(xyz)
+            peak = counts.max()
+            if peak > 0:
+                level = (np.log1p(counts) / np.log1p(peak)).astype(np.float32)[..., None]
+                image += level * (color - background)
+
+        if bodies:
+            self._draw_bodies(image, bodies)
+        return np.clip(image, 0, 255).astype(np.uint8)
+
+    def _draw_bodies(self, image, bodies):
+        r = self.body_radius
+        dy, dx = np.mgrid[-r:r + 1, -r:r + 1]
+        disc = dx ** 2 + dy ** 2 <= r ** 2
+        dx, dy = dx[disc], dy[disc]
+
+        for position, color in bodies:
+            ix, iy, _ = self.project(np.asarray(position, dtype=float).reshape(1, 3))
+            x = ix[0] + dx
+            y = iy[0] + dy
+            keep = (x >= 0) & (x < self.width) & (y >= 0) & (y < self.height)
+            image[y[keep], x[keep]] = hex_to_rgb(color)
+
+
+def simulation_frame(renderer, sim, body_names=()):
+    """
+    渲染模拟的当前状态
+
+    body_names 中的天体按 REBOUND 粒子名或粒子序号查找，用 SolarSystemBodies 中的颜色
+    单独绘制（按序号给出或数据库中没有的天体为白色），其余粒子作为群体绘制；
+    找不到的名称或超出范围的序号被忽略。
+    """
+    xyz = np.empty((sim.N, 3))
+    sim.serialize_particle_data(xyz=xyz)
+
+    bodies = []
+    population = np.ones(sim.N, dtype=bool)
+    for name in body_names:
+        if isinstance(name, (int, np.integer)):
+            if not -sim.N <= name < sim.N:
+                continue
+            index = int(name) % sim.N
+            population[index] = False
+            bodies.append((xyz[index], "#FFFFFF"))
+            continue
+        try:
+            p = sim.particles[name]
+        except rebound.ParticleNotFound:
+            continue
+        index = p.index
+        population[index] = False
+        config = SolarSystemBodies.get_by_name(name)
+        color = config.color if config is not None and config.color else "#FFFFFF"
+        bodies.append((xyz[index], color))
+
+    return renderer.render(xyz[population], bodies)
+
+
+# ==================== 并行渲染检查点 ====================
+
+_worker_state = None
+
+
+def _init_worker(renderer, checkpoint_path, body_names):
+    # 索引已由主进程修复并换算为快照序号，工作进程只读存档，不写 .idx
+    global _worker_state
+    _worker_state = (renderer, rebound.Simulationarchive(checkpoint_path), body_names)
+
+
+def _render_task(task):
+    frame, blob, out_dir = task
+    renderer, archive, body_names = _worker_state
+    image = simulation_frame(renderer, archive[blob], body_names)
+    if out_dir is None:
+        return image
+    path = os.path.join(out_dir, f"frame_{frame:06d}.png")
+    write_png(path, image)
+    return path
+
+
+def render_checkpoint(checkpoint_path, times, renderer=None, out_dir=None,
+                      video=None, fps=30, body_names=None, workers=None):
+    """
+    并行渲染检查点文件中与 times 最接近的快照
+
+    out_dir 不为空时，各工作进程直接写出 frame_000000.png 等文件；
+    video 不为空时，按顺序把原始帧写入 ffmpeg 管道编码为视频。
+
+    Parameters:
+    -----------
+    checkpoint_path : str
+        CheckpointManager 写出的存档路径
+    times : array_like
+        各帧的模拟时间
+    renderer : FrameRenderer
+        渲染器配置，默认 FrameRenderer()
+    out_dir : str
+        PNG 序列输出目录
+    video : str
+        视频输出路径（需要 ffmpeg）
+    fps : int
+        视频帧率
+    body_names : list of str or int
+        单独绘制的天体（粒子名或粒子序号），默认为太阳与八大行星
+    workers : int
+        工作进程数，默认为 CPU 核数
+    """
+    if (out_dir is None) == (video is None):
+        raise ValueError("out_dir 与 video 必须且只能指定一个")
+    if renderer is None:
+        renderer = FrameRenderer()
+    if body_names is None:
+        body_names = [SolarSystemBodies.SUN.name] + [p.name for p in SolarSystemBodies.get_all_planets()]
+
+    # 在主进程中修复一次索引，并把各帧时间换算为快照序号
+    checkpoint = CheckpointManager(checkpoint_path)
+    positions = [checkpoint.nearest(t) for t in times]
+    blobs = checkpoint.read_index()['blob'][positions].tolist()
+
+    if out_dir is not None:
+        os.makedirs(out_dir, exist_ok=True)
+    tasks = [(frame, blob, out_dir) for frame, blob in enumerate(blobs)]
+
+    pipe = None
+    if video is not None:
+        pipe = subprocess.Popen(ffmpeg_command(video, renderer.width, renderer.height, fps),
+                                stdin=subprocess.PIPE)
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(renderer, checkpoint_path, list(body_names))) as executor:
+            # map 按提交顺序返回结果，保证视频帧顺序
+            for result in executor.map(_render_task, tasks):
+                if pipe is not None:
+                    pipe.stdin.write(result.tobytes())
+    finally:
+        if pipe is not None:
+            pipe.stdin.close()
+            pipe.wait()
@@ -0,0 +1,252 @@
+"""
+拉普拉斯–拉格朗日长期理论
+以闭式解快速推演行星 e、inc、varpi、Omega 的长期演化（百万年量级）
+"""
+from functools import lru_cache
+import numpy as np
+import rebound
+from celestial_bodies import SolarSystemBodies, SystemBuilder
+from constants import C_LIGHT, G
+
+
+# 单位：AU、yr、Msun
+ARCSEC_PER_RAD = 180.0 / np.pi * 3600.0
+
+
+def laplace_coefficient(s, j, alpha, n_points=512):
+    """
+    拉普拉斯系数 b_s^(j)(alpha) = (1/pi) ∫_0^{2pi} cos(j psi) / (1 - 2 alpha cos psi + alpha^2)^s dpsi
+
+    被积函数是光滑周期函数，等距梯形公式指数收敛。
+    """
+    psi = np.linspace(0.0, 2 * np.pi, n_points, endpoint=False)
+    alpha = np.asarray(alpha, dtype=float)[..., None]
+    integrand = np.cos(j * psi) / (1 - 2 * alpha * np.cos(psi) + alpha ** 2) ** s
+    return 2 * integrand.mean(axis=-1)
+
+
+@lru_cache(maxsize=None)
+def secular_matrices(masses, semi_major_axes, central_mass=1.0, gr_eccentricities=None):
+    """
+    构建拉普拉斯–拉格朗日系数矩阵 A（偏心率）与 B（倾角），单位 rad/yr
+
+    参数须为元组以便缓存；返回的矩阵为只读。
+    gr_eccentricities 不为空时，在 A 的对角元上加入广义相对论近日点进动
+    3 G M n / (c^2 a (1 - e^2))。
+
+    参考 Murray & Dermott, Solar System Dynamics, 式 (7.136)–(7.139)。
+    """
+    m = np.asarray(masses, dtype=float)
+    a = np.asarray(semi_major_axes, dtype=float)
+    N = len(m)
+    n = np.sqrt(G * (central_mass + m) / a ** 3)
+
+    A = np.zeros((N, N))
+    B = np.zeros((N, N))
+    for j in range(N):
+        for k in range(N):
+            if j == k:
+                continue
+            if a[j] < a[k]:
+                alpha = a[j] / a[k]
+                alpha_bar = alpha  # 外侧摄动天体
+            else:
+                alpha = a[k] / a[j]
+                alpha_bar = 1.0  # 内侧摄动天体
+
+            factor = n[j] / 4 * m[k] / (central_mass + m[j]) * alpha * alpha_bar
+            b1 = laplace_coefficient(1.5, 1, alpha)
+            b2 = laplace_coefficient(1.5, 2, alpha)
+
+            A[j, j] += factor * b1
+            A[j, k] = -factor * b2
+            B[j, j] -= factor * b1
+            B[j, k] = factor * b1
+
+    if gr_eccentricities is not None:
+        e = np.asarray(gr_eccentricities, dtype=float)
+        A[np.diag_indices(N)] += 3 * G * central_mass * n / (C_LIGHT ** 2 * a * (1 - e ** 2))
+
+    A.setflags(write=False)
+    B.setflags(write=False)
+    return A, B
+
+
+class SecularSolution:
+    """
+    拉普拉斯–拉格朗日闭式解
+
+    z = e exp(i varpi) 与 zeta = I exp(i Omega) 满足 dz/dt = i A z、dzeta/dt = i B zeta，
+    将其分解为本征模后，任意历元的根数只需一次矩阵乘法。
+
+    Parameters:
+    -----------
+    names : list of str
+        行星名称
+    masses, semi_major_axes, eccentricities : array_like
+        质量（Msun）、半长轴（AU）、离心率
+    inclinations, varpi, Omega : array_like
+        倾角、近日点经度、升交点经度（度）
+    central_mass : float
+        中心天体质量（Msun）
+    include_gr : bool
+        是否加入广义相对论近日点进动修正
+    epoch : float
+        初始根数对应的时间（年）
+    """
+
+    def __init__(self, names, masses, semi_major_axes, eccentricities,
+                 inclinations, varpi, Omega, central_mass=1.0,
+                 include_gr=False, epoch=0.0):
+        self.names = list(names)
+        self.masses = np.asarray(masses, dtype=float)
+        self.semi_major_axes = np.asarray(semi_major_axes, dtype=float)
+        self.epoch = epoch
+
+        e0 = np.asarray(eccentricities, dtype=float)
+        gr = tuple(e0) if include_gr else None
+        self.A, self.B = secular_matrices(
+            tuple(self.masses), tuple(self.semi_major_axes), central_mass, gr
+        )
+
+        # 本征频率（rad/yr）与本征向量
+        g, V = np.linalg.eig(self.A)
+        f, W = np.linalg.eig(self.B)
+        self.g, self.V = g.real, V.real
+        self.f, self.W = f.real, W.real
+
+        z0 = e0 * np.exp(1j * np.radians(varpi))
+        zeta0 = np.radians(inclinations) * np.exp(1j * np.radians(Omega))
+        self._cz = np.linalg.solve(self.V, z0)
+        self._czeta = np.linalg.solve(self.W, zeta0)
+
+    @classmethod
+    def from_bodies(cls, planets=None, central_mass=None, include_gr=False):
+        """由 CelestialBodyConfig 列表构建（默认为 SolarSystemBodies 的八大行星）"""
+        if planets is None:
+            planets = SolarSystemBodies.get_all_planets()
+        if central_mass is None:
+            central_mass = SolarSystemBodies.SUN.mass
+
+        return cls(
+            names=[p.name for p in planets],
+            masses=[p.mass for p in planets],
+            semi_major_axes=[p.semi_major_axis for p in planets],
+            eccentricities=[p.eccentricity for p in planets],
+            inclinations=[p.inclination for p in planets],
+            varpi=[p.longitude_of_ascending_node + p.argument_of_pericenter for p in planets],
+            Omega=[p.longitude_of_ascending_node for p in planets],
+            central_mass=central_mass,
+            include_gr=include_gr,
+        )
+
+    @property
+    def g_arcsec_per_yr(self):
+        """偏心率本征频率 g_i（角秒/年）"""
+        return self.g * ARCSEC_PER_RAD
+
+    @property
+    def f_arcsec_per_yr(self):
+        """倾角本征频率 f_i（角秒/年）"""
+        return self.f * ARCSEC_PER_RAD
+
+    def complex_elements(self, times):
+        """返回 z 与 zeta，形状 (n_times, n_planets)"""
+        dt = np.atleast_1d(np.asarray(times, dtype=float)) - self.epoch
+        z = (np.exp(1j * np.outer(dt, self.g)) * self._cz) @ self.V.T
+        zeta = (np.exp(1j * np.outer(dt, self.f)) * self._czeta) @ self.W.T
+        return z, zeta
+
+    def elements(self, times):
+        """
+        计算任意历元的长期根数
+
+        Parameters:
+        -----------
+        times : float or array_like
+            时间（年）
+
+        Returns:
+        --------
+        dict
+            e、inc、varpi、Omega，形状 (n_times, n_planets)，角度单位为度
+        """
+        z, zeta = self.complex_elements(times)
+        return {
+            "e": np.abs(z),
+            "inc": np.degrees(np.abs(zeta)),
+            "varpi": np.degrees(np.angle(z)) % 360.0,
+            "Omega": np.degrees(np.angle(zeta)) % 360.0,
+        }
+
+
+def validate_against_nbody(duration=5000.0, n_samples=51, include_gr=False, dt=None):
+    """
+    与短时间的直接 N 体积分比较
+
+    用 WHFast 积分太阳 + 八大行星，以积分开始时的日心根数初始化长期解，
+    比较 z = e exp(i varpi) 与 zeta = I exp(i Omega) 的偏差。
+    偏差包含短周期项（约 1e-3 量级）及木星–土星近共振等线性理论未包含的效应。
+
+    Parameters:
+    -----------
+    duration : float
+        积分时长（年）
+    n_samples : int
+        采样点数
+    include_gr : bool
+        长期解是否加入广义相对论修正（N 体积分不含该项，仅用于比较量级）
+    dt : float
+        积分步长（年），默认取水星周期的 1/20
+
+    Returns:
+    --------
+    dict
+        times，各行星 z 与 zeta 的最大偏差 max_dz、max_dzeta，以及长期解 solution
+    """
+    planets = SolarSystemBodies.get_all_planets()
+
+    sim = rebound.Simulation()
+    sim.units = ('yr', 'AU', 'Msun')
+    sim.integrator = "whfast"
+    sim.dt = dt if dt is not None else planets[0].semi_major_axis ** 1.5 / 20
+    builder = SystemBuilder(sim)
+    builder.add_bodies([SolarSystemBodies.SUN] + planets)
+    sim.move_to_com()
+
+    def heliocentric_elements():
+        sun = builder.particle("Sun")
+        orbits = [builder.particle(p.name).orbit(primary=sun) for p in planets]
+        z = np.array([o.e * np.exp(1j * o.pomega) for o in orbits])
+        zeta = np.array([o.inc * np.exp(1j * o.Omega) for o in orbits])
+        return orbits, z, zeta
+
+    orbits, z0, zeta0 = heliocentric_elements()
+    solution = SecularSolution(
+        names=[p.name for p in planets],
+        masses=[p.mass for p in planets],
+        semi_major_axes=[o.a for o in orbits],
+        eccentricities=np.abs(z0),
+        inclinations=np.degrees(np.abs(zeta0)),
+        varpi=np.degrees(np.angle(z0)),
+        Omega=np.degrees(np.angle(zeta0)),
+        central_mass=SolarSystemBodies.SUN.mass,
+        include_gr=include_gr,
+        epoch=sim.t,
+    )
+
+    times = np.linspace(0.0, duration, n_samples)
+    z_nbody = np.empty((n_samples, len(planets)), dtype=complex)
+    zeta_nbody = np.empty_like(z_nbody)
+    for i, t in enumerate(times):
+        sim.integrate(t, exact_finish_time=1)
+        _, z_nbody[i], zeta_nbody[i] = heliocentric_elements()
+
+    z_sec, zeta_sec = solution.complex_elements(times)
+    return {
+        "times": times,
+        "names": solution.names,
+        "max_dz": np.abs(z_sec - z_nbody).max(axis=0),
+        "max_dzeta": np.abs(zeta_sec - zeta_nbody).max(axis=0),
+        "solution": solution,
+    }
@@ -0,0 +1,234 @@
+"""
+共享内存快照分发
+积分进程将模拟状态复制一次到 multiprocessing.shared_memory 块，
+分析进程以零拷贝的 NumPy 视图读取；多缓冲配合序号锁使积分可以继续推进
+"""
+import time
+from dataclasses import dataclass
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+import numpy as np
+
+
+# 共享内存块开头的控制区
+CONTROL_DTYPE = np.dtype([
+    ('latest', '<i8'),  # 最新完成的缓冲区序号，-1 表示尚未发布
+    ('generation', '<u8'),  # 已发布的快照总数
+    ('n_buffers', '<i8'),
+    ('capacity', '<i8'),
+], align=True)
+CONTROL_SIZE = 64
+
+
+def buffer_dtype(capacity):
+    """
+    单个快照缓冲区的结构化布局
+
+    seq 为序号锁：写入期间为奇数，写完为偶数；读者在使用前后比较 seq 判断数据是否被覆盖。
+    """
+    return np.dtype([
+        ('seq', '<u8'),
+        ('generation', '<u8'),
+        ('t', '<f8'),
+        ('N', '<i8'),
+        ('xyz', '<f8', (capacity, 3)),
+        ('vxvyvz', '<f8', (capacity, 3)),
+        ('m', '<f8', (capacity,)),
+    ], align=True)
+
+
+def _views(shm):
+    control = np.ndarray((1,), dtype=CONTROL_DTYPE, buffer=shm.buf)
+    dtype = buffer_dtype(int(control['capacity'][0]))
+    buffers = np.ndarray((int(control['n_buffers'][0]),), dtype=dtype,
+                         buffer=shm.buf, offset=CONTROL_SIZE)
+    return control, buffers
+
+
+class SnapshotPublisher:
+    """
+    快照发布者（积分进程中使用）
+
+    共 n_buffers 个缓冲区轮流写入：发布第 g 个快照时覆盖第 g - n_buffers 个。
+    读者只要在之后 n_buffers - 1 次发布内用完快照，就不会与写入冲突；
+    否则 Snapshot.is_valid() 返回 False。
+
+    Parameters:
+    -----------
+    capacity : int
+        最大粒子数
+    n_buffers : int
+        缓冲区数量（至少为 2）
+    name : str
+        共享内存块名称，默认由系统生成
+    """
+
+    def __init__(self, capacity, n_buffers=2, name=None):
+        if n_buffers < 2:
+            raise ValueError("n_buffers 至少为 2")
+
+        size = CONTROL_SIZE + n_buffers * buffer_dtype(capacity).itemsize
+        self.shm = SharedMemory(name=name, create=True, size=size)
+
+        control = np.ndarray((1,), dtype=CONTROL_DTYPE, buffer=self.shm.buf)
+        control['latest'] = -1
+        control['generation'] = 0
+        control['n_buffers'] = n_buffers
+        control['capacity'] = capacity
+        self.control, self.buffers = _views(self.shm)
+        self.buffers['seq'] = 0
+
+    @property
+    def name(self):
+        """共享内存块名称，传给 SnapshotReader"""
+        return self.shm.name
+
+    @property
+    def capacity(self):
+        return int(self.control['capacity'][0])
+
+    def publish(self, sim):
+        """
+        将模拟当前状态复制到下一个缓冲区并发布
+
+        Returns:
+        --------
+        int
+            该快照的代数
+        """
+        N = sim.N
+        if N > self.capacity:
+            raise ValueError(f"粒子数 {N} 超过共享内存容量 {self.capacity}")
+
+        generation = int(self.control['generation'][0]) + 1
+        slot = generation % len(self.buffers)
+        seq = self.buffers['seq']
+
+        seq[slot] += 1  # 奇数：写入中
+        sim.serialize_particle_data(
+            xyz=self.buffers['xyz'][slot],
+            vxvyvz=self.buffers['vxvyvz'][slot],
+            m=self.buffers['m'][slot],
+        )
+        self.buffers['t'][slot] = sim.t
+        self.buffers['N'][slot] = N
+        self.buffers['generation'][slot] = generation
+        seq[slot] += 1  # 偶数：写入完成
+
+        self.control['latest'] = slot
+        self.control['generation'] = generation
+        return generation
+
+    def close(self):
+        """释放并删除共享内存块"""
+        self.control = self.buffers = None
+        self.shm.close()
+        # 与发布者共用 resource_tracker 的读者会注销该块（见 SnapshotReader），
+        # 重新登记（幂等）使 unlink 中的注销不在 resource_tracker 中报错
+        resource_tracker.register(self.shm._name, "shared_memory")
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+@dataclass
+class Snapshot:
+    """一次发布的零拷贝视图（xyz、vxvyvz、m 直接指向共享内存）"""
+    generation: int
+    t: float
+    xyz: np.ndarray
+    vxvyvz: np.ndarray
+    m: np.ndarray
+    _seq: np.ndarray
+    _slot: int
+    _seq_value: int
+
+    def is_valid(self):
+        """快照在读取期间是否未被发布者覆盖"""
+        return int(self._seq[self._slot]) == self._seq_value
+
+    def copy(self):
+        """复制到进程私有内存，返回 (t, xyz, vxvyvz, m)"""
+        return self.t, self.xyz.copy(), self.vxvyvz.copy(), self.m.copy()
+
+
+class SnapshotReader:
+    """
+    快照读者（分析进程中使用）
+
+    Parameters:
+    -----------
+    name : str
+        SnapshotPublisher.name
+    """
+
+    def __init__(self, name):
+        try:
+            self.shm = SharedMemory(name=name, track=False)
+        except TypeError:
+            # Python < 3.13 没有 track 参数，附加时也会登记到本进程的 resource_tracker；
+            # 独立启动的读者有自己的 resource_tracker，退出时会删除发布者的共享内存块，
+            # 因此立即注销
+            self.shm = SharedMemory(name=name)
+            resource_tracker.unregister(self.shm._name, "shared_memory")
+        self.control, self.buffers = _views(self.shm)
+
+    @property
+    def generation(self):
+        """已发布的快照总数"""
+        return int(self.control['generation'][0])
+
+    def latest(self):
+        """返回最新的快照；尚未发布时返回 None"""
+        seq = self.buffers['seq']
+        while True:
+            slot = int(self.control['latest'][0])
+            if slot < 0:
+                return None
+            seq_value = int(seq[slot])
+            if seq_value % 2:
+                continue
+            N = int(self.buffers['N'][slot])
+            snapshot = Snapshot(
+                generation=int(self.buffers['generation'][slot]),
+                t=float(self.buffers['t'][slot]),
+                xyz=self.buffers['xyz'][slot][:N],
+                vxvyvz=self.buffers['vxvyvz'][slot][:N],
+                m=self.buffers['m'][slot][:N],
+                _seq=seq,
+                _slot=slot,
+                _seq_value=seq_value,
+            )
+            if snapshot.is_valid():
+                return snapshot
+
+    def wait_newer(self, generation, timeout=None, poll=1e-3):
+        """
+        等待代数大于 generation 的快照
+
+        Returns:
+        --------
+        Snapshot or None
+            超时返回 None
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.generation <= generation:
+            if deadline is not None and time.monotonic() > deadline:
+                return None
+            time.sleep(poll)
+        return self.latest()
+
+    def close(self):
+        """断开共享内存（调用前需释放所有 Snapshot 视图）"""
+        self.control = self.buffers = None
+        self.shm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,132 @@
+"""
+SystemBuilder 层级插入的测试
+"""
+import random
+import pytest
+
+rebound = pytest.importorskip("rebound")
+from celestial_bodies import (  # noqa: E402
+    CelestialBodyConfig, SolarSystemBodies, SystemBuilder,
+    add_planets_by_name, add_solar_system
+)
+
+
+def make_sim():
+    sim = rebound.Simulation()
+    sim.units = ('yr', 'AU', 'Msun')
+    return sim
+
+
+def hierarchy(depth=5, width=3):
+    """恒星下挂 width 个分支，每个分支为 depth 层的主从链"""
+    bodies = [CelestialBodyConfig(name="Star", mass=1.0)]
+    for branch in range(width):
+        primary, a = "Star", 1.0 + branch
+        for level in range(depth):
+            name = f"B{branch}L{level}"
+            bodies.append(CelestialBodyConfig(
+                name=name, mass=1e-3 * 0.1 ** level, semi_major_axis=a, eccentricity=0.01,
+                primary=primary,
+            ))
+            primary, a = name, 0.1 * a
+    return bodies
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_shuffled_hierarchy_inserted_primary_first(seed):
+    bodies = hierarchy()
+    by_name = {b.name: b for b in bodies}
+    random.Random(seed).shuffle(bodies)
+
+    sim = make_sim()
+    builder = SystemBuilder(sim)
+    inserted = builder.add_bodies(bodies)
+
+    assert sorted(inserted) == sorted(by_name)
+    position = {name: i for i, name in enumerate(inserted)}
+    for body in bodies:
+        if body.primary is not None:
+            assert position[body.primary] < position[body.name]
+
+    # 每个天体的轨道都相对于其主天体
+    for body in bodies:
+        assert sim.particles[position[body.name]].name == body.name
+        if body.primary is not None:
+            orbit = builder.particle(body.name).orbit(primary=builder.particle(body.primary))
+            assert orbit.a == pytest.approx(body.semi_major_axis, rel=1e-9)
+
+
+def test_sorted_input_keeps_order():
+    bodies = hierarchy(depth=3, width=2)
+    inserted = SystemBuilder(make_sim()).add_bodies(bodies)
+    assert inserted == [b.name for b in bodies]
+
+
+def test_cycle_raises():
+    bodies = [
+        CelestialBodyConfig(name="Star", mass=1.0),
+        CelestialBodyConfig(name="A", mass=1e-6, semi_major_axis=1.0, primary="B"),
+        CelestialBodyConfig(name="B", mass=1e-6, semi_major_axis=1.0, primary="A"),
+    ]
+    with pytest.raises(ValueError, match="环"):
+        SystemBuilder(make_sim()).add_bodies(bodies)
+
+
+def test_duplicate_name_raises():
+    bodies = [CelestialBodyConfig(name="Star", mass=1.0)] * 2
+    with pytest.raises(ValueError):
+        SystemBuilder(make_sim()).add_bodies(bodies)
+
+
+def test_missing_primary_error_skip_detach():
+    bodies = [
+        CelestialBodyConfig(name="Star", mass=1.0),
+        CelestialBodyConfig(name="Moon", mass=1e-8, semi_major_axis=0.01, primary="Planet"),
+        CelestialBodyConfig(name="Submoon", mass=1e-12, semi_major_axis=0.001, primary="Moon"),
+    ]
+
+    with pytest.raises(ValueError, match="Planet"):
+        SystemBuilder(make_sim()).add_bodies(bodies)
+
+    # skip：跳过该天体及其全部下属天体
+    sim = make_sim()
+    assert SystemBuilder(sim).add_bodies(bodies, missing_primary="skip") == ["Star"]
+    assert sim.N == 1
+
+    # detach：不指定主天体直接插入，其下属天体仍挂在它上面
+    sim = make_sim()
+    builder = SystemBuilder(sim)
+    assert builder.add_bodies(bodies, missing_primary="detach") == ["Star", "Moon", "Submoon"]
+    orbit = builder.particle("Submoon").orbit(primary=builder.particle("Moon"))
+    assert orbit.a == pytest.approx(0.001, rel=1e-9)
+
+
+def test_unknown_missing_primary_mode():
+    with pytest.raises(ValueError):
+        SystemBuilder(make_sim()).add_bodies([], missing_primary="ignore")
+
+
+def test_add_solar_system_skips_moons_without_planets():
+    sim = make_sim()
+    builder = add_solar_system(sim, include_planets=False, include_moons=True)
+    assert sim.N == 1
+    assert "Sun" in builder and "Moon" not in builder
+
+
+def test_add_solar_system_attaches_moons():
+    sim = make_sim()
+    builder = add_solar_system(sim, include_moons=True)
+    assert sim.N == 1 + len(SolarSystemBodies.get_all_planets()) + len(SolarSystemBodies.get_all_moons())
+    moon = SolarSystemBodies.get_by_name("Moon")
+    orbit = builder.particle("Moon").orbit(primary=builder.particle(moon.primary))
+    assert orbit.a == pytest.approx(moon.semi_major_axis, rel=1e-6)
+
+
+def test_add_planets_by_name_detaches_missing_primary():
+    sim = make_sim()
+    builder = add_planets_by_name(sim, ["Moon", "Sun", "Earth", "Io"])
+    assert sim.N == 4
+    assert builder.particle("Io").name == "Io"
+    moon = SolarSystemBodies.get_by_name("Moon")
+    orbit = builder.particle("Moon").orbit(primary=builder.particle("Earth"))
+    assert orbit.a == pytest.approx(moon.semi_major_axis, rel=1e-6)
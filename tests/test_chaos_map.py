@@ -0,0 +1,42 @@
+"""
+混沌图的测试
+"""
+import os
+import numpy as np
+import pytest
+
+rebound = pytest.importorskip("rebound")
+from chaos_map import ChaosMap, ChaosMapConfig, chaos_indicators  # noqa: E402
+
+
+def test_default_tmax_detects_chaos_in_3_1_gap():
+    # 3:1 共振空隙内的混沌轨道；默认 tmax 下 MEGNO 应明显偏离 2
+    megno, lyapunov = chaos_indicators(ChaosMapConfig(), 2.50, 0.25)
+    assert megno > 2
+    assert lyapunov > 0
+
+
+def test_default_tmax_regular_orbit():
+    megno, _ = chaos_indicators(ChaosMapConfig(), 2.30, 0.1)
+    assert abs(megno - 2) < 0.5
+
+
+def test_tiles_are_cached_and_resumed(tmp_path):
+    config = ChaosMapConfig(a_range=(2.2, 2.6), n_a=3, y_range=(0.0, 0.2), n_y=2,
+                            tmax=50.0, tile_size=2)
+    cache_dir = str(tmp_path / "map")
+    chaos_map = ChaosMap(config, cache_dir)
+    assert len(chaos_map.pending_tiles()) == 2
+
+    result = chaos_map.compute(workers=2, progress=False)
+    assert result["megno"].shape == (2, 3)
+    assert np.all(np.isfinite(result["megno"]))
+    assert ChaosMap(config, cache_dir).pending_tiles() == []
+    assert not any(name.endswith(".tmp") for name in os.listdir(cache_dir))
+
+
+def test_cache_with_different_config_is_rejected(tmp_path):
+    cache_dir = str(tmp_path / "map")
+    ChaosMap(ChaosMapConfig(tmax=50.0), cache_dir)
+    with pytest.raises(ValueError):
+        ChaosMap(ChaosMapConfig(tmax=100.0), cache_dir)
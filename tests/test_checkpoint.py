@@ -0,0 +1,64 @@
+"""
+CheckpointManager 的回归测试
+"""
+import os
+import numpy as np
+import pytest
+
+rebound = pytest.importorskip("rebound")
+from checkpoint import CheckpointManager, INDEX_DTYPE  # noqa: E402
+
+
+def make_sim():
+    sim = rebound.Simulation()
+    sim.units = ('yr', 'AU', 'Msun')
+    sim.integrator = "whfast"
+    sim.dt = 0.01
+    sim.add(m=1.0, name="Sun")
+    sim.add(m=1e-3, a=1.0, e=0.05, name="Planet")
+    sim.add(a=2.5, e=0.1)
+    sim.move_to_com()
+    return sim
+
+
+@pytest.fixture
+def archive(tmp_path):
+    path = str(tmp_path / "run.bin")
+    ckpt = CheckpointManager(path, interval=1.0)
+    ckpt.integrate(make_sim(), 3.0)
+    return path
+
+
+def test_seek_with_missing_index(archive):
+    os.remove(archive + ".idx")
+    ckpt = CheckpointManager(archive)
+    assert ckpt.seek(2.0).t == pytest.approx(2.0, abs=0.01)
+    assert len(ckpt) == 4
+
+
+def test_seek_with_truncated_index(archive):
+    size = os.path.getsize(archive + ".idx")
+    with open(archive + ".idx", "r+b") as f:
+        f.truncate(size - INDEX_DTYPE.itemsize - 5)
+    ckpt = CheckpointManager(archive)
+    assert ckpt.seek(3.0).t == pytest.approx(3.0, abs=0.01)
+    assert os.path.getsize(archive + ".idx") == 4 * INDEX_DTYPE.itemsize
+
+
+def test_seek_after_archive_lost_snapshots(archive):
+    # 索引比存档多出的记录在 seek 时被截掉
+    ckpt = CheckpointManager(archive)
+    extra = np.array([(9.0, 0.0, 4)], dtype=INDEX_DTYPE)
+    with open(archive + ".idx", "ab") as f:
+        extra.tofile(f)
+    assert ckpt.seek(9.0).t == pytest.approx(3.0, abs=0.01)
+    assert len(ckpt) == 4
+
+
+def test_resume_at_tmax_adds_no_snapshot(archive):
+    for _ in range(2):
+        ckpt = CheckpointManager(archive, interval=1.0)
+        sim = ckpt.resume_or_create(make_sim)
+        ckpt.integrate(sim, 3.0)
+    assert len(CheckpointManager(archive)) == 4
+    assert np.all(np.diff(CheckpointManager(archive).times) > 0)
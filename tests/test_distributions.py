@@ -0,0 +1,123 @@
+"""
+别名表、预设群体与本地分布文件加载的测试
+"""
+import numpy as np
+import pytest
+
+from asteroid_belt import kirkwood_gap_mask
+from distributions import (
+    AliasTable, Histogram, load_histogram, load_joint_table, main_belt_model
+)
+
+
+def test_alias_table_frequencies_match_weights():
+    weights = np.array([1.0, 0.0, 3.0, 0.5, 0.0, 5.5])
+    rng = np.random.default_rng(0)
+    n = 1_000_000
+    counts = np.bincount(AliasTable(weights).sample(n, rng), minlength=len(weights))
+
+    expected = weights / weights.sum()
+    assert np.all(counts[weights == 0] == 0)
+    # 多项分布的标准差约为 sqrt(p (1 - p) / n) < 5e-4
+    assert np.allclose(counts / n, expected, atol=3e-3)
+
+
+@pytest.mark.parametrize("weights", [[], [[1.0, 2.0]], [1.0, -1.0], [0.0, 0.0], [1.0, np.nan]])
+def test_alias_table_rejects_invalid_weights(weights):
+    with pytest.raises(ValueError):
+        AliasTable(weights)
+
+
+def test_main_belt_never_samples_kirkwood_gaps():
+    model = main_belt_model()
+    model.prepare()
+    orbits = model.sample(200_000, np.random.default_rng(1))
+
+    assert kirkwood_gap_mask(orbits['a']).sum() == 0
+    assert orbits['a'].min() >= 2.0
+    assert orbits['a'].max() <= 3.4
+
+
+def test_histogram_loaders_agree(tmp_path):
+    csv = tmp_path / "a.csv"
+    csv.write_text("# low, high, weight\n2.0, 2.4, 1\n2.6, 3.0, 3\n")
+    npz = tmp_path / "a.npz"
+    np.savez(npz, edges=[2.0, 2.4, 2.6, 3.0], weights=[1, 0, 3])
+
+    from_csv = load_histogram(str(csv))
+    from_npz = load_histogram(str(npz))
+    assert np.array_equal(from_csv.edges, from_npz.edges)
+    assert np.array_equal(from_csv.weights, from_npz.weights)
+
+    # 行间的空隙以零权重区间填补，永远不会被抽到
+    a = from_csv.sample(100_000, np.random.default_rng(2))
+    assert not np.any((a > 2.4) & (a < 2.6))
+
+
+def test_joint_table_loaders_agree(tmp_path):
+    csv = tmp_path / "joint.csv"
+    csv.write_text("2.0,2.5,0.0,0.1,0,10,2\n2.5,3.0,0.1,0.2,10,20,1\n")
+    npz = tmp_path / "joint.npz"
+    counts = np.zeros((2, 2, 2))
+    counts[0, 0, 0] = 2
+    counts[1, 1, 1] = 1
+    np.savez(npz, a_edges=[2.0, 2.5, 3.0], e_edges=[0.0, 0.1, 0.2],
+             inc_edges=[0, 10, 20], counts=counts)
+
+    from_csv = load_joint_table(str(csv))
+    from_npz = load_joint_table(str(npz))
+    assert np.allclose(from_csv.lows, from_npz.lows)
+    assert np.allclose(from_csv.highs, from_npz.highs)
+    assert np.array_equal(from_csv.weights, from_npz.weights)
+    assert from_csv.highs[:, 2].max() == pytest.approx(np.radians(20))
+
+
+@pytest.mark.parametrize("text", [
+    "2.0, 2.4\n",  # 列数不对
+    "2.0, 2.4, 1\n2.2, 2.6, 1\n",  # 区间重叠
+    "2.0, 2.4, one\n",  # 非数值
+    "2.4, 2.0, 1\n",  # 上界小于下界
+    "2.0, 2.4, -1\n",  # 负权重
+])
+def test_malformed_histogram_csv_raises(tmp_path, text):
+    path = tmp_path / "bad.csv"
+    path.write_text(text)
+    with pytest.raises(ValueError):
+        load_histogram(str(path))
+
+
+def test_malformed_joint_csv_raises(tmp_path):
+    path = tmp_path / "bad.csv"
+    path.write_text("2.0,2.5,0.0,0.1,0,10\n")
+    with pytest.raises(ValueError):
+        load_joint_table(str(path))
+
+
+@pytest.mark.parametrize("arrays", [
+    {"weights": [1.0]},  # 缺少 edges
+    {"edges": [2.0, 3.0]},  # 缺少 weights/counts
+    {"edges": [2.0, 3.0], "weights": [1.0, 2.0]},  # 长度不一致
+    {"edges": [3.0, 2.0], "weights": [1.0]},  # 不递增
+])
+def test_malformed_histogram_npz_raises(tmp_path, arrays):
+    path = tmp_path / "bad.npz"
+    np.savez(path, **arrays)
+    with pytest.raises(ValueError):
+        load_histogram(str(path))
+
+
+@pytest.mark.parametrize("arrays", [
+    {"a_edges": [2.0, 3.0], "e_edges": [0.0, 0.1], "counts": np.ones((1, 1, 1))},
+    {"a_edges": [2.0, 3.0], "e_edges": [0.0, 0.1], "inc_edges": [0, 10],
+     "counts": np.ones((2, 1, 1))},
+])
+def test_malformed_joint_npz_raises(tmp_path, arrays):
+    path = tmp_path / "bad.npz"
+    np.savez(path, **arrays)
+    with pytest.raises(ValueError):
+        load_joint_table(str(path))
+
+
+def test_histogram_rejects_bad_edges():
+    with pytest.raises(ValueError):
+        Histogram([0.0, 1.0, 1.0], [1.0, 1.0])
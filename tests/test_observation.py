@@ -0,0 +1,101 @@
+"""
+视位置计算的测试
+"""
+import numpy as np
+import pytest
+
+from asteroid_belt import ORBIT_DTYPE
+from constants import C_LIGHT
+from observation import (
+    ECLIPTIC_TO_ICRS, apparent_positions, compare_with_astropy, elements_to_state
+)
+
+
+def random_orbits(n, seed=0):
+    rng = np.random.default_rng(seed)
+    orbits = np.empty(n, dtype=ORBIT_DTYPE)
+    orbits['a'] = rng.uniform(2.1, 3.3, n)
+    orbits['e'] = rng.uniform(0.0, 0.3, n)
+    orbits['inc'] = rng.uniform(0.0, 0.4, n)
+    orbits['Omega'] = rng.uniform(0, 2 * np.pi, n)
+    orbits['omega'] = rng.uniform(0, 2 * np.pi, n)
+    orbits['f'] = rng.uniform(0, 2 * np.pi, n)
+    return orbits
+
+
+def separation_arcsec(ra1, dec1, ra2, dec2):
+    """角距（haversine 形式，小角度时不损失精度）"""
+    ra1, dec1, ra2, dec2 = map(np.radians, (ra1, dec1, ra2, dec2))
+    hav = (np.sin((dec1 - dec2) / 2) ** 2
+           + np.cos(dec1) * np.cos(dec2) * np.sin((ra1 - ra2) / 2) ** 2)
+    return np.degrees(2 * np.arcsin(np.sqrt(hav))) * 3600
+
+
+def test_broadcast_over_epochs():
+    xyz, vxvyvz = elements_to_state(random_orbits(20))
+    observers = np.array([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [-1.0, 0.0, 0.0]])
+    batch = apparent_positions(observers, np.broadcast_to(xyz, (3, 20, 3)), vxvyvz)
+    assert batch["ra"].shape == (3, 20)
+    for k, observer in enumerate(observers):
+        single = apparent_positions(observer, xyz, vxvyvz)
+        for key in ("ra", "dec", "distance", "light_time", "phase"):
+            assert np.allclose(batch[key][k], single[key], rtol=0, atol=1e-12)
+
+
+def test_elements_to_state_matches_rebound():
+    rebound = pytest.importorskip("rebound")
+    orbits = random_orbits(50)
+    xyz, vxvyvz = elements_to_state(orbits)
+
+    sim = rebound.Simulation()
+    sim.units = ('yr', 'AU', 'Msun')
+    sim.add(m=1.0)
+    for o in orbits:
+        sim.add(m=0, a=o['a'], e=o['e'], inc=o['inc'], Omega=o['Omega'],
+                omega=o['omega'], f=o['f'], primary=sim.particles[0])
+    expected_xyz = np.empty((sim.N, 3))
+    expected_v = np.empty((sim.N, 3))
+    sim.serialize_particle_data(xyz=expected_xyz, vxvyvz=expected_v)
+
+    assert np.allclose(xyz, expected_xyz[1:], rtol=0, atol=1e-12)
+    assert np.allclose(vxvyvz, expected_v[1:], rtol=0, atol=1e-11)
+
+
+def test_astropy_agreement_within_stated_tolerance():
+    pytest.importorskip("astropy")
+    xyz, vxvyvz = elements_to_state(random_orbits(200))
+    observer = np.array([0.98, 0.17, 0.0])
+    separation = compare_with_astropy(observer, xyz, vxvyvz)
+    assert separation.max() < 1e-6
+
+
+def test_light_time_matches_rebound_back_integration():
+    # 只有太阳有质量时，目标在 t - tau 的真实位置可由 REBOUND 向后积分得到
+    rebound = pytest.importorskip("rebound")
+    orbits = random_orbits(8, seed=1)
+    observer = np.array([0.0, -1.0, 0.0])
+
+    sim = rebound.Simulation()
+    sim.units = ('yr', 'AU', 'Msun')
+    sim.integrator = "ias15"
+    sim.add(m=1.0)
+    for o in orbits:
+        sim.add(m=0, a=o['a'], e=o['e'], inc=o['inc'], Omega=o['Omega'],
+                omega=o['omega'], f=o['f'], primary=sim.particles[0])
+    xyz = np.empty((sim.N, 3))
+    vxvyvz = np.empty((sim.N, 3))
+    sim.serialize_particle_data(xyz=xyz, vxvyvz=vxvyvz)
+
+    result = apparent_positions(observer, xyz[1:], vxvyvz[1:], sun_xyz=xyz[0], gm=sim.G)
+
+    for i, tau in enumerate(result["light_time"]):
+        past = sim.copy()
+        past.integrate(-tau, exact_finish_time=1)
+        p = past.particles[i + 1]
+        los = (np.array([p.x, p.y, p.z]) - observer) @ ECLIPTIC_TO_ICRS.T
+        ra = np.degrees(np.arctan2(los[1], los[0])) % 360.0
+        dec = np.degrees(np.arcsin(los[2] / np.linalg.norm(los)))
+
+        # 光行时方程的残差与方向误差
+        assert np.linalg.norm(los) / C_LIGHT == pytest.approx(tau, rel=1e-10)
+        assert separation_arcsec(ra, dec, result["ra"][i], result["dec"][i]) < 1e-6
@@ -0,0 +1,28 @@
+"""
+群体合成的可重复性测试
+"""
+import numpy as np
+import pytest
+
+from distributions import main_belt_model
+from population_synthesis import generate_population, synthesize_population
+
+
+@pytest.mark.parametrize("population", ["main_belt", "trojans", main_belt_model(a_min=2.1)],
+                         ids=["main_belt", "trojans", "model"])
+def test_same_seed_same_population_for_any_worker_count(tmp_path, population):
+    N, chunk_size = 5000, 1000
+    serial = synthesize_population(str(tmp_path / "w1.npy"), N, population, seed=7,
+                                   chunk_size=chunk_size, workers=1)
+    parallel = synthesize_population(str(tmp_path / "w4.npy"), N, population, seed=7,
+                                     chunk_size=chunk_size, workers=4)
+    in_memory = generate_population(N, population, seed=7, chunk_size=chunk_size)
+
+    assert np.array_equal(serial, parallel)
+    assert np.array_equal(serial, in_memory)
+
+
+def test_different_seed_different_population():
+    a = generate_population(1000, seed=1, chunk_size=250)
+    b = generate_population(1000, seed=2, chunk_size=250)
+    assert not np.array_equal(a, b)
@@ -0,0 +1,38 @@
+"""
+拉普拉斯–拉格朗日长期解的测试
+"""
+import numpy as np
+import pytest
+
+from secular import ARCSEC_PER_RAD, SecularSolution
+
+
+def test_matches_nbody_over_short_run():
+    pytest.importorskip("rebound")
+    from secular import validate_against_nbody
+
+    result = validate_against_nbody(duration=500.0, n_samples=11)
+    # 偏差以短周期项为主，外行星因木星–土星近共振最大（约 1e-2）
+    assert np.all(result["max_dz"] < 2e-2)
+    assert np.all(result["max_dz"][:4] < 1e-3)
+    assert np.all(result["max_dzeta"] < 1e-3)
+
+
+def test_initial_elements_reproduced_at_epoch():
+    solution = SecularSolution(
+        names=["A", "B"], masses=[1e-3, 3e-4], semi_major_axes=[5.2, 9.5],
+        eccentricities=[0.05, 0.06], inclinations=[1.3, 2.5],
+        varpi=[14.0, 92.0], Omega=[100.0, 113.0], epoch=10.0,
+    )
+    elements = solution.elements(10.0)
+    assert np.allclose(elements["e"][0], [0.05, 0.06])
+    assert np.allclose(elements["inc"][0], [1.3, 2.5])
+    assert np.allclose(elements["varpi"][0], [14.0, 92.0])
+    assert np.allclose(elements["Omega"][0], [100.0, 113.0])
+
+
+def test_gr_precession_of_mercury():
+    newtonian = SecularSolution.from_bodies()
+    relativistic = SecularSolution.from_bodies(include_gr=True)
+    arcsec_per_century = (relativistic.A[0, 0] - newtonian.A[0, 0]) * ARCSEC_PER_RAD * 100
+    assert arcsec_per_century == pytest.approx(43.0, abs=0.1)
@@ -0,0 +1,99 @@
+"""
+共享内存快照的测试
+"""
+import os
+import subprocess
+import sys
+import textwrap
+import numpy as np
+import pytest
+
+rebound = pytest.importorskip("rebound")
+from shared_snapshot import SnapshotPublisher, SnapshotReader  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_sim(n=10):
+    sim = rebound.Simulation()
+    sim.add(m=1.0)
+    for i in range(n):
+        sim.add(a=1.0 + 0.1 * i)
+    return sim
+
+
+def run_python(code):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    return subprocess.run([sys.executable, "-c", textwrap.dedent(code)],
+                          env=env, capture_output=True, text=True, timeout=60)
+
+
+def test_reader_sees_published_state():
+    sim = make_sim()
+    with SnapshotPublisher(capacity=32) as pub, SnapshotReader(pub.name) as reader:
+        assert reader.latest() is None
+        pub.publish(sim)
+        snapshot = reader.latest()
+        assert snapshot.generation == 1
+        assert snapshot.xyz.shape == (sim.N, 3)
+        assert snapshot.xyz[1, 0] == pytest.approx(sim.particles[1].x)
+        assert snapshot.is_valid()
+
+        # 轮转 n_buffers 次后旧快照被覆盖
+        pub.publish(sim)
+        pub.publish(sim)
+        assert not snapshot.is_valid()
+        del snapshot
+
+
+def test_separate_reader_process_does_not_unlink_block():
+    sim = make_sim()
+    pub = SnapshotPublisher(capacity=32)
+    try:
+        pub.publish(sim)
+        result = run_python(f"""
+            from shared_snapshot import SnapshotReader
+            reader = SnapshotReader({pub.name!r})
+            snapshot = reader.latest()
+            print(snapshot.generation, snapshot.xyz.shape[0])
+            del snapshot
+            reader.close()
+        """)
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.split() == ["1", str(sim.N)]
+
+        # 读者进程退出后共享内存块仍然存在，可以再次附加
+        with SnapshotReader(pub.name) as reader:
+            assert reader.generation == 1
+    finally:
+        pub.close()
+
+    with pytest.raises(FileNotFoundError):
+        SnapshotReader(pub.name)
+
+
+def test_pool_readers_share_tracker_cleanly():
+    # 工作进程与发布者共用 resource_tracker：读者注销后发布者仍能正常删除，且无报错
+    result = run_python("""
+        from concurrent.futures import ProcessPoolExecutor
+        import rebound
+        from shared_snapshot import SnapshotPublisher, SnapshotReader
+
+        def read(name):
+            with SnapshotReader(name) as reader:
+                return reader.generation
+
+        if __name__ == "__main__":
+            sim = rebound.Simulation()
+            sim.add(m=1.0)
+            sim.add(a=1.0)
+            pub = SnapshotPublisher(capacity=4)
+            pub.publish(sim)
+            with ProcessPoolExecutor(2) as executor:
+                print(list(executor.map(read, [pub.name] * 4)))
+            pub.close()
+    """)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "[1, 1, 1, 1]"
+    assert "Traceback" not in result.stderr
+    assert "leaked" not in result.stderr